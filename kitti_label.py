@@ -1,69 +1,64 @@
 #!/usr/bin/env python2
 
 from PIL import Image
+from itertools import islice
+from multiprocessing import Pool
+import numpy as np
 import argparse
 import os
-import csv
+import time
+import warnings
+import yaml
 
-OUT_LABELS_DIR = "labels"
+from ultralytics.data.utils import hash_fraction
 
-CLAZZ_NUMBERS = {
-            "bswitch": 0, 
-            "grbtn": 1, 
-            "gswitch": 2, 
-            "rrockbtn": 3, 
-            "rsrbtn": 4, 
-            "rswitch": 5, 
-            "rypushbtn": 6, 
-            "ybtn": 7, 
-            "ysroundbtn": 8,
-            "handle": 9,
-            "valve": 10
-        }
+OUT_LABELS_DIR = "labels"
+PROGRESS_INTERVAL = 1000
+# type, bbox2_left, bbox2_top, bbox2_right, bbox2_bottom of the KITTI label rows
+KITTI_COLUMNS = (0, 4, 5, 6, 7)
 
 def getSampleId(path):
     basename = os.path.basename(path)
     return os.path.splitext(basename)[0]
 
-def resolveClazzNumberOrNone(clazz, use_dont_care):
-    if clazz == "bswitch":
-        return CLAZZ_NUMBERS["bswitch"]
-    elif clazz == "grbtn":
-        return CLAZZ_NUMBERS["grbtn"]
-    elif clazz == "gswitch":
-        return CLAZZ_NUMBERS["gswitch"]
-    elif clazz == "rrockbtn":
-        return CLAZZ_NUMBERS["rrockbtn"]
-    elif clazz == "rsrbtn":
-        return CLAZZ_NUMBERS["rsrbtn"]
-    elif clazz == "rswitch":
-        return CLAZZ_NUMBERS["rswitch"]
-    elif clazz == "rypushbtn":
-        return CLAZZ_NUMBERS["rypushbtn"]
-    elif clazz == "ybtn":
-        return CLAZZ_NUMBERS["ybtn"]
-    elif clazz == "ysroundbtn":
-        return CLAZZ_NUMBERS["ysroundbtn"]
-    elif clazz == "handle":
-        return CLAZZ_NUMBERS["handle"]
-    elif clazz == "valve":
-        return CLAZZ_NUMBERS["valve"]
-    return None
+def loadClazzNumbers(data_yaml):
+    # The class numbers are taken from the 'names' of the dataset yaml used for training, so both always agree.
+    # The names and the KITTI types are both lowercased, so they are matched case-insensitively.
+    with open(data_yaml) as yaml_file:
+        names = yaml.safe_load(yaml_file)["names"]
+    if isinstance(names, list):
+        names = dict(enumerate(names))
+    return {str(name).lower(): int(number) for number, name in names.items()}
+
+def resolveClazzNumbers(clazzes, clazz_numbers):
+    # Looks up all the types of a sample at once; unknown types resolve to -1.
+    known = np.array(sorted(clazz_numbers))
+    numbers = np.array([clazz_numbers[clazz] for clazz in known], dtype=int)
+    index = np.searchsorted(known, clazzes).clip(max=len(known) - 1)
+    return np.where(known[index] == clazzes, numbers[index], -1)
 
 def convertToYoloBBox(bbox, size):
     # Yolo uses bounding bbox coordinates and size relative to the image size.
     # This is taken from https://pjreddie.com/media/files/voc_label.py .
+    # 'bbox' is an (n, 4) array of (left, right, top, bottom) rows, all boxes are converted at once.
+    bbox = np.asarray(bbox, dtype=float)
     dw = 1. / size[0]
     dh = 1. / size[1]
-    x = (bbox[0] + bbox[1]) / 2.0
-    y = (bbox[2] + bbox[3]) / 2.0
-    w = bbox[1] - bbox[0]
-    h = bbox[3] - bbox[2]
+    x = (bbox[:, 0] + bbox[:, 1]) / 2.0
+    y = (bbox[:, 2] + bbox[:, 3]) / 2.0
+    w = bbox[:, 1] - bbox[:, 0]
+    h = bbox[:, 3] - bbox[:, 2]
     x = x * dw
     w = w * dw
     y = y * dh
     h = h * dh
-    return (x, y, w, h)
+    return np.stack((x, y, w, h), axis=1)
+
+def isTrainingSample(img_path, training_samples):
+    # The split is decided by a stable hash of the sample id instead of the list order, so a sample keeps its split
+    # when the directory is walked in another order or when new samples are generated later. It is the hash_fraction()
+    # of hashsplit() (yolov10/write.py), so with the same train fraction both put every sample in the same split.
+    return hash_fraction(img_path) < training_samples
 
 def readRealImageSize(img_path):
     # This loads the whole sample image and returns its size.
@@ -73,35 +68,99 @@ def readFixedImageSize():
     # This is not exact for all images but most (and it should be faster).
     return (1242, 375)
 
-def parseSample(lbl_path, img_path, use_dont_care):
-    with open(lbl_path) as csv_file:
-        reader = csv.DictReader(csv_file, fieldnames=["type", "truncated", "occluded", "alpha", "bbox2_left", "bbox2_top", "bbox2_right", "bbox2_bottom", "bbox3_height", "bbox3_width", "bbox3_length", "bbox3_x", "bbox3_y", "bbox3_z", "bbox3_yaw"], delimiter=" ")
-        yolo_labels = []
-        for row in reader:
-            clazz_number = resolveClazzNumberOrNone(row["type"], use_dont_care)
-            if clazz_number is not None:
-                size = readRealImageSize(img_path)
-                #size = readFixedImageSize()
-                # Image coordinate is in the top left corner.
-                bbox = (
-                        float(row["bbox2_left"]),
-                        float(row["bbox2_right"]),
-                        float(row["bbox2_top"]),
-                        float(row["bbox2_bottom"])
-                       )
-                yolo_bbox = convertToYoloBBox(bbox, size)
-                # Yolo expects the labels in the form:
-                # <object-class> <x> <y> <width> <height>.
-                yolo_label = (clazz_number,) + yolo_bbox
-                yolo_labels.append(yolo_label)
-    return yolo_labels
+def parseSample(lbl_path, img_path, use_dont_care, clazz_numbers, size=None):
+    # The whole label file is parsed in one pass and its boxes are normalized as one array. The image size is the
+    # same for every row of a sample, so it is probed at most once, and only when the sample has a row to convert.
+    # A known size (e.g. the writer resolution) skips the probe entirely.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # empty label files
+        rows = np.loadtxt(lbl_path, dtype=str, delimiter=" ", usecols=KITTI_COLUMNS, ndmin=2)
+    clazz = resolveClazzNumbers(np.char.lower(rows[:, 0]), clazz_numbers)
+    keep = clazz >= 0
+    if not keep.any():
+        return clazz[:0], np.zeros((0, 4))
+    if size is None:
+        size = readRealImageSize(img_path)
+    # Image coordinate is in the top left corner.
+    left, top, right, bottom = rows[keep, 1:].astype(float).T
+    return clazz[keep], convertToYoloBBox(np.stack((left, right, top, bottom), axis=1), size)
+
+def formatYoloLabels(clazz, yolo_bboxes):
+    # Yolo expects the labels in the form:
+    # <object-class> <x> <y> <width> <height>.
+    return "".join("{} {} {} {} {}\n".format(c, *b) for c, b in zip(clazz.tolist(), yolo_bboxes.tolist()))
+
+def writeYoloLabels(labels):
+    # Writes the label files of a whole batch in one pass, after all its samples have been parsed.
+    for sample_id, text in labels:
+        with open(os.path.join(OUT_LABELS_DIR, "{}.txt".format(sample_id)), "w") as yolo_label_file:
+            yolo_label_file.write(text)
+
+def convertBatch(task):
+    # Converts a batch of samples end to end; this is the unit of work handed to the worker pool.
+    samples, use_dont_care, clazz_numbers, size = task
+    labels = [(getSampleId(lbl_path), formatYoloLabels(*parseSample(lbl_path, img_path, use_dont_care, clazz_numbers, size)))
+              for lbl_path, img_path in samples]
+    writeYoloLabels(labels)
+    return [img_path for lbl_path, img_path in samples]
+
+def listSamples(label_dir, image_2_dir):
+    for dir_path, sub_dirs, files in os.walk(label_dir):
+        for file_name in files:
+            if file_name.endswith(".txt"):
+                lbl_path = os.path.join(dir_path, file_name)
+                sample_id = getSampleId(lbl_path)
+                img_path = os.path.join(image_2_dir, "{}.png".format(sample_id))
+                yield lbl_path, img_path
+
+def reportProgress(done, start_time):
+    elapsed = max(time.time() - start_time, 1e-9)
+    print("Converted {} label files ({:.1f} files/s)".format(done, done / elapsed))
+
+def batchSamples(samples, batch_size):
+    # Groups the samples into lists of 'batch_size' while they are listed, without collecting them all first.
+    samples = iter(samples)
+    batch = list(islice(samples, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(samples, batch_size))
+
+def convertSamples(samples, use_dont_care, clazz_numbers, size=None, workers=1, batch_size=64):
+    # Streams the samples through a worker pool and returns the image paths in the original order. Each worker
+    # converts 'batch_size' samples at a time and writes their label files together, so the inter-process overhead
+    # is amortized over many files. The samples are consumed lazily, conversion starts while they are still listed.
+    tasks = ((batch, use_dont_care, clazz_numbers, size) for batch in batchSamples(samples, max(batch_size, 1)))
+    sample_img_pathes = []
+    start_time = time.time()
+    if workers > 1:
+        pool = Pool(workers)
+        results = pool.imap(convertBatch, tasks)
+    else:
+        pool = None
+        results = (convertBatch(task) for task in tasks)
+    try:
+        for img_pathes in results:
+            done = len(sample_img_pathes)
+            sample_img_pathes.extend(img_pathes)
+            if len(sample_img_pathes) // PROGRESS_INTERVAL > done // PROGRESS_INTERVAL:
+                reportProgress(len(sample_img_pathes), start_time)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    reportProgress(len(sample_img_pathes), start_time)
+    return sample_img_pathes
 
 def parseArguments():
     parser = argparse.ArgumentParser(description="Generates labels for training darknet on KITTI.")
     parser.add_argument("--label_dir", default="button_data/Camera", help="data_object_label_2/training/label_2 directory; can be downloaded from KITTI.")
     parser.add_argument("--image_2_dir", default="button_data/Camera/rgb", help="data_object_image_2/training/image_2 directory; can be downloaded from KITTI.")
-    parser.add_argument("--training-samples", type=int, default=0.8, help="percentage of the samples to be used for training between 0.0 and 1.0.")
+    parser.add_argument("--data", default="yolov10/data.yaml", help="dataset yaml whose 'names' define the class numbers.")
+    parser.add_argument("--training-samples", type=float, default=0.8, help="percentage of the samples to be used for training between 0.0 and 1.0.")
     parser.add_argument("--use-dont-care", action="store_true", help="do not ignore 'DontCare' labels.")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes used for the conversion.")
+    parser.add_argument("--batch-size", type=int, default=64, help="number of samples converted and written by a worker at a time.")
+    parser.add_argument("--image-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"), help="fixed image size of all samples (e.g. the writer resolution); skips reading the images.")
     args = parser.parse_args()
     if args.training_samples < 0 or args.training_samples > 1:
         print("Invalid argument {} for --training-samples. Expected a percentage value between 0.0 and 1.0.")
@@ -115,28 +174,16 @@ def main():
         os.makedirs(OUT_LABELS_DIR)
 
     print("Generating darknet labels...")
-    sample_img_pathes = []
     print(args.label_dir)
-    for dir_path, sub_dirs, files in os.walk(args.label_dir):
-        for file_name in files:
-            if file_name.endswith(".txt"):
-                lbl_path = os.path.join(dir_path, file_name)
-                sample_id = getSampleId(lbl_path)
-                img_path = os.path.join(args.image_2_dir, "{}.png".format(sample_id))
-                sample_img_pathes.append(img_path)
-                yolo_labels = parseSample(lbl_path, img_path, args.use_dont_care)
-                with open(os.path.join(OUT_LABELS_DIR, "{}.txt".format(sample_id)), "w") as yolo_label_file:
-                    for lbl in yolo_labels:
-                        yolo_label_file.write("{} {} {} {} {}\n".format(*lbl))
+    clazz_numbers = loadClazzNumbers(args.data)
+    size = tuple(args.image_size) if args.image_size else None
+    sample_img_pathes = convertSamples(listSamples(args.label_dir, args.image_2_dir), args.use_dont_care, clazz_numbers, size, args.workers, args.batch_size)
 
     print("Writing training and test sample ids...")
-    first_test_sample_index = int(args.training_samples * len(sample_img_pathes))
-    with open("kitti_train.txt", "w") as train_file:
-        for sample_index in range(first_test_sample_index):
-            train_file.write("{}\n".format(sample_img_pathes[sample_index]))
-    with open("kitti_test.txt", "w") as test_file:
-        for sample_index in range(first_test_sample_index, len(sample_img_pathes)):
-            test_file.write("{}\n".format(sample_img_pathes[sample_index]))
+    with open("kitti_train.txt", "w") as train_file, open("kitti_test.txt", "w") as test_file:
+        for img_path in sample_img_pathes:
+            sample_file = train_file if isTrainingSample(img_path, args.training_samples) else test_file
+            sample_file.write("{}\n".format(img_path))
 
 if __name__ == "__main__":
     main()
@@ -1 +1 @@
-python kitti_label.py --label_dir button_data/Camera/object_detection --image_2_dir button_data/Camera/rgb
\ No newline at end of file
+python kitti_label.py --label_dir button_data/Camera/object_detection --image_2_dir button_data/Camera/rgb --workers 8 --image-size 512 512
\ No newline at end of file
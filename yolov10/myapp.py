@@ -1,40 +1,20 @@
 import gradio as gr
-import cv2
 import tempfile
 from ultralytics import YOLOv10
+from ultralytics.engine.pool import ModelPool
+
+models = ModelPool(maxsize=2, model_class=YOLOv10)  # loaded once per checkpoint and image size
 
 
 def yolov10_inference(image, video, model_id, image_size, conf_threshold):
-    model = YOLOv10(f'/home/user/Downloads/{model_id}.pt')
+    model = models.get(f'/home/user/Downloads/{model_id}.pt', imgsz=int(image_size))
     if image:
         results = model.predict(source=image, imgsz=image_size, conf=conf_threshold)
         annotated_image = results[0].plot()
         return annotated_image[:, :, ::-1], None
     else:
-        video_path = tempfile.mktemp(suffix=".webm")
-        with open(video_path, "wb") as f:
-            with open(video, "rb") as g:
-                f.write(g.read())
-
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
         output_video_path = tempfile.mktemp(suffix=".webm")
-        out = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*'vp80'), fps, (frame_width, frame_height))
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            results = model.predict(source=frame, imgsz=image_size, conf=conf_threshold)
-            annotated_frame = results[0].plot()
-            out.write(annotated_frame)
-
-        cap.release()
-        out.release()
+        model.predict_video(video, output_video_path, batch=8, imgsz=image_size, conf=conf_threshold, verbose=False)
 
         return None, output_video_path
 
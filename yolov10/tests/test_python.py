@@ -1,7 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import contextlib
-from copy import copy
+from copy import copy, deepcopy
 from pathlib import Path
 
 import cv2
@@ -124,6 +124,204 @@ def test_predict_img():
     assert len(results) == t.shape[0]
 
 
+def test_predict_pipeline():
+    """Test that pipelined prediction returns the same results in the same order as lockstep prediction."""
+    model = YOLO(CFG)
+    results = model(ASSETS, imgsz=32, batch=2)
+    pipelined = model(ASSETS, imgsz=32, batch=2, pipeline=2)
+    assert [r.path for r in pipelined] == [r.path for r in results]
+    assert all(torch.equal(a.boxes.data, b.boxes.data) for a, b in zip(results, pipelined))
+    assert "queue" in pipelined[0].speed
+
+
+def test_predict_pipeline_video():
+    """Test that pipelined prediction saves the labels and videos of a mixed image and video source like lockstep."""
+    source = TMP / "pipeline_video"
+    source.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(source / "a.jpg"), cv2.imread(str(SOURCE)))
+    writer = cv2.VideoWriter(str(source / "b.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 5, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+    cv2.imwrite(str(source / "c.jpg"), cv2.imread(str(ASSETS / "zidane.jpg")))
+
+    model, saved = YOLO(CFG), []
+    for pipeline in 0, 2:
+        project = TMP / f"pipeline_video_{pipeline}"
+        model(source, imgsz=32, batch=2, conf=0.0, save=True, save_txt=True, project=project, pipeline=pipeline)
+        saved.append(sorted(str(f.relative_to(project)) for f in project.rglob("*.*")))
+    assert saved[0] == saved[1]
+    assert "predict/b.avi" in saved[0] and "predict/c.jpg" in saved[0]
+
+
+def test_video_pyav():
+    """Test that the PyAV decoder returns the frames of the OpenCV decoder for 'vid_stride', scaled down to 'size'."""
+    pytest.importorskip("av")
+    from ultralytics.data.loaders import LoadImagesAndVideos
+
+    video = TMP / "pyav.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 25, dtype=np.uint8))
+    writer.release()
+
+    frames = {}
+    for backend, size in ("opencv", None), ("pyav", 32):
+        loader = LoadImagesAndVideos(str(video), vid_stride=3, backend=backend, size=size)
+        frames[backend] = [im for _, batch, _ in loader for im in batch]
+    assert all(im.shape == (24, 32, 3) for im in frames["pyav"])
+    assert [round(im.mean() / 25) for im in frames["pyav"]] == [round(im.mean() / 25) for im in frames["opencv"]]
+
+
+def test_predict_prefetch():
+    """Test that prefetching image sources return the same batches in order, with letterboxed images in the workers."""
+    from ultralytics.data.augment import LetterBox
+    from ultralytics.data.loaders import LoadImagesAndVideos
+
+    files = [str(SOURCE)] * 5 + [str(ASSETS / "zidane.jpg")] * 2
+    ims = [im for _, batch, _ in LoadImagesAndVideos(files, batch=2) for im in batch]
+    letterbox = LetterBox(32)
+    batches = list(LoadImagesAndVideos(files, batch=2, prefetch=2, transform=lambda x: letterbox(image=x)))
+    assert all(np.array_equal(a, b) for a, b in zip(ims, [im for batch in batches for im in batch[1]]))
+    assert all(im.shape == (32, 32, 3) for batch in batches for im in batch[3])
+    source = TMP / "prefetch.txt"  # lists of paths are loaded as images before prediction, a *.txt file is not
+    source.write_text("\n".join(files))
+    model = YOLO(CFG)
+    assert len(model(source, imgsz=32, batch=2, prefetch=2)) == len(files)
+
+    # Images are letterboxed once, by the source, except in the batch of mixed shapes which the source did not stack
+    letterbox, calls = model.predictor.letterbox, []
+    model.predictor.letterbox = lambda same_shapes: calls.append(same_shapes) or letterbox(same_shapes)
+    assert len(model(source, imgsz=32, batch=2, prefetch=2, pipeline=1)) == len(files)
+    assert len(calls) == len(files) + 1
+
+    # The images read ahead are released when the iteration is abandoned
+    loader = LoadImagesAndVideos(files, batch=2, prefetch=2)
+    next(iter(loader))
+    pool = loader.pool
+    loader.close()
+    assert loader.pool is None and pool._shutdown
+    results = model.predict(source, imgsz=32, batch=2, prefetch=2, pipeline=0, stream=True)
+    next(results)
+    pool = model.predictor.dataset.pool
+    results.close()
+    assert model.predictor.dataset.pool is None and pool._shutdown
+
+
+def test_predict_same_shape_batch():
+    """Test that batched letterboxing of same-shape frames matches letterboxing each frame on its own."""
+    from ultralytics.data.augment import LetterBox
+
+    ims = [cv2.imread(str(ASSETS / "zidane.jpg")), cv2.imread(str(ASSETS / "zidane.jpg"))[::-1].copy()]
+    for auto in (False, True):
+        letterbox = LetterBox(64, auto=auto)
+        assert np.array_equal(letterbox.batch(ims), np.stack([letterbox(image=x) for x in ims]))
+    model = YOLO(CFG)
+    model.predict(ims, imgsz=64)
+    predictor = model.predictor
+    im = predictor.preprocess(ims)
+    assert im.is_contiguous() and im.shape == (2, 3, 64, 64)
+    assert torch.equal(predictor.preprocess(ims), im)  # reused buffer
+    for pt, triton in (True, False), (False, True), (False, False):  # PyTorch, Triton and other exported models
+        predictor.model.pt, predictor.model.triton = pt, triton
+        predictor.imgsz = (64, 96)  # rectangular, minimum padding for PyTorch models
+        im = predictor.preprocess(ims)
+        expected = np.stack(predictor.pre_transform(ims))[..., ::-1].transpose((0, 3, 1, 2))
+        assert torch.equal(torch.from_numpy(np.ascontiguousarray(expected)).float() / 255, im)
+    assert im.shape == (2, 3, 64, 96)
+
+
+def test_model_pool():
+    """Test that the model pool reuses loaded models and evicts the least recently used one."""
+    from ultralytics.engine.pool import ModelPool
+
+    pool = ModelPool(maxsize=2)
+    model = pool.get(CFG, imgsz=32)
+    assert pool.get(CFG, imgsz=32) is model and model.predictor.done_warmup
+    assert len(pool.predict(CFG, SOURCE, imgsz=64)) == 1
+    pool.get(CFG, imgsz=32)  # most recently used
+    pool.get(CFG, imgsz=96)
+    assert (CFG, 32) in pool and (CFG, 64) not in pool and len(pool) == 2
+
+
+def test_model_pool_concurrent():
+    """Test that a slow model load only blocks the callers of the same model."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ultralytics.engine.pool import ModelPool
+
+    loaded, release = threading.Event(), threading.Event()
+
+    def model_class(weights):
+        if weights == "slow.yaml":
+            loaded.set()
+            release.wait(30)
+        return YOLO(CFG)
+
+    pool = ModelPool(maxsize=2, model_class=model_class)
+    model = pool.get(CFG, imgsz=32)
+    with ThreadPoolExecutor(3) as executor:
+        slow = [executor.submit(pool.get, "slow.yaml", imgsz=32) for _ in range(2)]
+        try:
+            assert loaded.wait(10)
+            assert executor.submit(pool.get, CFG, imgsz=32).result(timeout=5) is model  # not blocked by the slow load
+        finally:
+            release.set()
+        assert slow[0].result() is slow[1].result()  # loaded once
+    assert len(pool) == 2 and not pool.loading
+
+
+def test_micro_batcher():
+    """Test that concurrent requests to the micro-batcher are predicted in batches and returned to their callers."""
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ultralytics.engine.batcher import MicroBatcher
+
+    ims = [np.full((32, 48, 3), i * 40, dtype=np.uint8) for i in range(6)]
+    with MicroBatcher(YOLO(CFG), max_batch=4, max_wait=0.5, imgsz=32) as batcher:
+        with ThreadPoolExecutor(6) as pool:
+            results = list(pool.map(batcher.predict, ims))
+        assert [r.orig_img[0, 0, 0] for r in results] == [im[0, 0, 0] for im in ims]
+        assert batcher.seen == 6 and batcher.batches < 6
+
+        async def main():
+            return await asyncio.gather(*(batcher.predict_async(im) for im in ims[:2]))
+
+        assert len(asyncio.run(main())) == 2
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_predict_video():
+    """Test batched video prediction with the annotated video written by a background thread."""
+    video, out = TMP / "video.avi", TMP / "video_pred.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(7):
+        writer.write(np.full((48, 64, 3), i * 30, dtype=np.uint8))
+    writer.release()
+    model = YOLO(CFG)
+    model.predict(SOURCE, imgsz=32)
+    assert model.predict_video(video, out, batch=3, imgsz=32) == 7
+    assert model.predictor.args.pipeline == 0 and model.predictor.args.batch == 1  # restored for later predictions
+    cap = cv2.VideoCapture(str(out))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 7
+    cap.release()
+    assert model.predict_video(video, TMP / "video_stride.avi", batch=3, imgsz=32, vid_stride=2) == 3
+    cap = cv2.VideoCapture(str(TMP / "video_stride.avi"))
+    assert cap.get(cv2.CAP_PROP_FPS) == 5  # source fps divided by the frame stride
+    cap.release()
+
+    # Encoder errors are raised in the caller instead of blocking the predictions
+    from unittest.mock import patch
+
+    with pytest.raises(RuntimeError):
+        model.predict_video(video, TMP / "missing" / "video_pred.avi", batch=1, imgsz=32)
+    with patch("ultralytics.engine.results.Results.plot", side_effect=ValueError("plot")):
+        with pytest.raises(ValueError):
+            model.predict_video(video, out, batch=1, imgsz=32)
+
+
 def test_predict_grey_and_4ch():
     """Test YOLO prediction on SOURCE converted to greyscale and 4-channel images."""
     im = Image.open(SOURCE)
@@ -186,6 +384,70 @@ def test_track_stream():
         model.track(video_url, imgsz=160, tracker=tracker)
 
 
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_stream_wait(monkeypatch):
+    """Test that multi-stream sources with 'stream_wait' keep batching the streams with frames after one ends."""
+    import time
+
+    from ultralytics.data import loaders
+    from ultralytics.data.loaders import LoadStreams
+
+    class SlowCapture:
+        def __init__(self, source):
+            self.cap = cv2.VideoCapture(source)
+
+        def __getattr__(self, name):
+            return getattr(self.cap, name)
+
+        def grab(self):
+            time.sleep(0.01)  # slower than the consumer, which then waits for frames
+            return self.cap.grab()
+
+    videos = [TMP / "stream_short.avi", TMP / "stream_long.avi"]
+    for video, n in zip(videos, (4, 12)):
+        writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+        for i in range(n):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+    streams = TMP / "streams.streams"
+    streams.write_text("\n".join(str(x) for x in videos))
+    lockstep = list(LoadStreams(str(streams), buffer=True))
+    with monkeypatch.context() as m:
+        m.setattr(loaders, "video_capture", lambda source, *args: SlowCapture(source))
+        loader, owned = LoadStreams(str(streams), buffer=True, wait=0.1), []
+        m.setattr(cv2, "waitKey", lambda delay: owned.append(loader.cond._is_owned()) or -1)
+        batches = list(loader)
+    assert owned and not any(owned)  # GUI events are handled without blocking the reader threads
+    assert all(len(b[1]) == 2 for b in lockstep)
+    assert len(batches) > len(lockstep) and batches[-1][0] == batches[0][0][1:]
+    results = YOLO(CFG).track(streams, imgsz=32, stream_buffer=True, stream_wait=0.1)
+    assert len(results) == sum(len(b[1]) for b in batches)
+
+
+def test_track_stream_index():
+    """Test that a partial stream batch updates the trackers of its streams when a source is streamed twice."""
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    from ultralytics.engine.results import Results
+    from ultralytics.trackers.track import on_predict_postprocess_end
+
+    im = np.zeros((32, 32, 3), dtype=np.uint8)
+    predictor = SimpleNamespace(
+        batch=(["0"], [im], [""]),  # only the second stream of source '0' has a new frame
+        args=SimpleNamespace(task="detect"),
+        dataset=SimpleNamespace(mode="stream", bs=2, sources=["0", "0"]),
+        source_state={"mode": "stream", "frame": 1, "fps": 30, "streams": [1]},
+        trackers=[MagicMock(), MagicMock()],
+        vid_path=[None, None],
+        save_dir=TMP,
+        results=[Results(im, path="0", names={0: "a"}, boxes=torch.zeros((0, 6)))],
+    )
+    on_predict_postprocess_end(predictor)
+    assert predictor.vid_path == [None, TMP / "0"]
+    predictor.trackers[0].reset.assert_not_called()
+
+
 def test_val():
     """Test the validation mode of the YOLO model."""
     YOLO(MODEL).val(data="coco8.yaml", imgsz=32, save_hybrid=True)
@@ -198,6 +460,16 @@ def test_train_scratch():
     model(SOURCE)
 
 
+def test_train_batch_augment():
+    """Test training the YOLO model with perspective, HSV and flip augmentations applied to whole batches."""
+    model = YOLO(CFG)
+    model.train(data="coco8.yaml", epochs=2, imgsz=32, batch_augment=True, close_mosaic=1, degrees=10, flipud=0.5)
+    dataset = model.trainer.train_loader.dataset
+    batch = model.trainer.preprocess_batch(dataset.collate_fn([dataset[i] for i in range(4)]))
+    assert batch["img"].shape == (4, 3, 32, 32)
+    assert ((batch["bboxes"] >= 0) & (batch["bboxes"] <= 1)).all()
+
+
 def test_train_pretrained():
     """Test training the YOLO model from a pre-trained state."""
     model = YOLO(WEIGHTS_DIR / "yolov8n-seg.pt")
@@ -225,6 +497,57 @@ def test_export_openvino():
     YOLO(f)(SOURCE)  # exported model inference
 
 
+def test_onnx_forward_concurrent():
+    """Test that concurrent ONNX Runtime forward() calls do not return each other's reused output arrays."""
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ultralytics.nn.autobackend import AutoBackend
+
+    x = onnx.helper.make_tensor_value_info("images", onnx.TensorProto.FLOAT, ["b", 3, "h", "w"])
+    y = onnx.helper.make_tensor_value_info("output0", onnx.TensorProto.FLOAT, ["b", 3, "h", "w"])
+    graph = onnx.helper.make_graph([onnx.helper.make_node("Identity", ["images"], ["output0"])], "identity", [x], [y])
+    f = TMP / "identity.onnx"
+    onnx.save(onnx.helper.make_model(graph, opset_imports=[onnx.helper.make_opsetid("", 13)], ir_version=8), f)
+    backend = AutoBackend(str(f))
+
+    def forward(i):
+        """Returns whether the output of an image filled with 'i' is that image."""
+        return bool((backend.forward(torch.full((1, 3, 256, 256), float(i))) == i).all())
+
+    with ThreadPoolExecutor(8) as executor:
+        assert all(executor.map(forward, range(1000)))
+
+
+def test_openvino_callback_error():
+    """Test that a failed OpenVINO request completes its batch future with the error instead of leaving it pending."""
+    import threading
+    from concurrent.futures import Future
+    from unittest.mock import MagicMock
+
+    from ultralytics.nn.autobackend import AutoBackend
+
+    backend = AutoBackend.__new__(AutoBackend)  # only the callback state, no OpenVINO model needed
+    backend.ov_lock, backend.device = threading.Lock(), torch.device("cpu")
+    request = MagicMock()
+    request.get_output_tensor.return_value.data = np.zeros((1, 2), dtype=np.float32)
+    failed = MagicMock()
+    failed.get_output_tensor.side_effect = RuntimeError("request failed")
+
+    state = {"future": Future(), "results": [None] * 3, "pending": 3}
+    backend._ov_callback(request, (state, 0))
+    backend._ov_callback(failed, (state, 1))
+    backend._ov_callback(request, (state, 2))  # completing after the error does not set the future again
+    with pytest.raises(RuntimeError):
+        state["future"].result(timeout=1)
+
+    state = {"future": Future(), "results": [None] * 2, "pending": 2}
+    for i in range(2):
+        backend._ov_callback(request, (state, i))
+    assert state["future"].result(timeout=1).shape == (2, 2)
+
+
 @pytest.mark.skipif(checks.IS_PYTHON_3_12, reason="CoreML not supported in Python 3.12")
 def test_export_coreml():
     """Test exporting the YOLO model to CoreML format."""
@@ -387,6 +710,211 @@ def test_data_converter():
     coco80_to_coco91_class()
 
 
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_data_kitti_labels():
+    """Test YOLODataset reading Omniverse Replicator KITTI labels directly."""
+    from ultralytics.data.dataset import YOLODataset
+
+    rgb, det = TMP / "kitti/Camera/rgb", TMP / "kitti/Camera/object_detection"
+    rgb.mkdir(parents=True, exist_ok=True)
+    det.mkdir(parents=True, exist_ok=True)
+    for i in range(2):
+        cv2.imwrite(str(rgb / f"{i:04d}.png"), np.zeros((40, 80, 3), dtype=np.uint8))
+    (det / "0000.txt").write_text(
+        "bswitch 0.00 0 0.00 10.00 10.00 30.00 20.00 0.00 0.00 0.00 0.00 0.00 0.00 0.00\n"
+        "valve 0.00 0 0.00 40.00 0.00 90.00 40.00 0.00 0.00 0.00 0.00 0.00 0.00 0.00\n"
+        "DontCare -1 -1 -10 0.00 0.00 5.00 5.00 -1 -1 -1 -1000 -1000 -1000 -10\n"
+    )
+    (det / "0001.txt").write_text("")
+    data = {"names": {0: "BSwitch", 1: "Valve"}, "label_format": "kitti"}
+    for _ in range(2):  # scan, then load from the *.cache file
+        dataset = YOLODataset(img_path=str(rgb), imgsz=64, augment=False, data=data)
+        assert (TMP / "kitti/Camera/object_detection.cache").exists()
+        labels = {Path(lb["im_file"]).stem: lb for lb in dataset.labels}
+        assert labels["0000"]["cls"].ravel().tolist() == [0, 1]
+        assert np.allclose(labels["0000"]["bboxes"], [[0.25, 0.375, 0.25, 0.25], [0.75, 0.5, 0.5, 1.0]])
+        assert len(labels["0001"]["cls"]) == 0
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_data_hashsplit():
+    """Test deterministic and incremental hash-based dataset splits."""
+    from ultralytics.data.dataset import YOLODataset
+    from ultralytics.data.utils import hash_fraction, hashsplit, load_split_manifest
+
+    images, labels = TMP / "hashsplit/images", TMP / "hashsplit/labels"
+    for d in images / "a", images / "b", labels / "a", labels / "b":
+        d.mkdir(parents=True, exist_ok=True)
+    for i in range(20):
+        cv2.imwrite(str(images / f"a/{i}.png"), np.zeros((16, 16, 3), dtype=np.uint8))
+        (labels / f"a/{i}.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+    n = hashsplit(images, weights=(0.5, 0.5, 0.0))
+    splits = load_split_manifest(TMP / "hashsplit/split.npz")
+    assert sum(n.values()) == 20 and n["test"] == 0
+
+    cv2.imwrite(str(images / "b/0.png"), np.zeros((16, 16, 3), dtype=np.uint8))  # append a new batch
+    (labels / "b/0.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+    hashsplit(images, weights=(0.5, 0.5, 0.0))
+    appended = load_split_manifest(TMP / "hashsplit/split.npz")
+    assert all(appended[k][: len(v)] == v for k, v in splits.items())  # existing images keep their split
+    assert sum(len(v) for v in appended.values()) == 21
+
+    mtime = (TMP / "hashsplit/split.npz").stat().st_mtime_ns
+    hashsplit(images, weights=(0.5, 0.5, 0.0))
+    assert (TMP / "hashsplit/split.npz").stat().st_mtime_ns == mtime  # unchanged manifest is not rewritten
+    assert all(hash_fraction(f) < 0.5 for f in appended["train"])  # same key as the KITTI conversion split
+
+    (images / "test").mkdir(exist_ok=True)  # an existing images/{train,val,test} layout is kept
+    cv2.imwrite(str(images / "test/0.png"), np.zeros((16, 16, 3), dtype=np.uint8))
+    assert hashsplit(images, weights=(0.5, 0.5, 0.0))["test"] == 1
+    (images / "test/0.png").unlink()
+
+    img_path = str(TMP / "hashsplit/split.npz/train")
+    dataset = YOLODataset(img_path=img_path, imgsz=32, augment=False, data={"names": {0: "a"}})
+    assert len(dataset) == len(appended["train"])
+    assert (TMP / "hashsplit/split.train.cache").exists()
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_data_cache_incremental(monkeypatch):
+    """Test that an outdated labels cache only re-verifies new or changed images."""
+    from ultralytics.data import dataset as ds
+
+    images, labels = TMP / "incremental/images", TMP / "incremental/labels"
+    images.mkdir(parents=True, exist_ok=True)
+    labels.mkdir(parents=True, exist_ok=True)
+    for i in range(4):
+        cv2.imwrite(str(images / f"{i}.png"), np.zeros((16, 16, 3), dtype=np.uint8))
+        (labels / f"{i}.txt").write_text(f"{i % 2} 0.5 0.5 0.{i + 1} 0.{i + 1}\n")
+    verified = []
+    verify = ds.verify_image_label
+    monkeypatch.setattr(ds, "verify_image_label", lambda args: verified.append(args[0]) or verify(args))
+    data = {"names": {0: "a"}}
+    ds.YOLODataset(img_path=str(images), imgsz=32, augment=False, data=data)
+    assert len(verified) == 4
+
+    verified.clear()
+    cv2.imwrite(str(images / "4.png"), np.zeros((16, 16, 3), dtype=np.uint8))  # new image
+    (labels / "0.txt").write_text("0 0.5 0.5 0.2 0.2\n0 0.1 0.1 0.1 0.1\n")  # changed label
+    dataset = ds.YOLODataset(img_path=str(images), imgsz=32, augment=False, data=data)
+    assert sorted(Path(f).name for f in verified) == ["0.png", "4.png"]
+    assert [len(lb["cls"]) for lb in dataset.labels] == [2, 1, 1, 1, 0]
+
+    dataset = ds.YOLODataset(img_path=str(images), imgsz=32, augment=False, data=data)  # columnar cache
+    assert [len(lb["cls"]) for lb in dataset.labels] == [2, 1, 1, 1, 0]
+    assert not dataset.labels[0]["bboxes"].flags.writeable  # memory-mapped
+
+    cv2.imwrite(str(images / "0a.png"), np.zeros((16, 16, 3), dtype=np.uint8))  # shifts the rows of images 1-4
+    (labels / "0a.txt").write_text("1 0.5 0.5 0.9 0.9\n")
+    for _ in range(2):  # rebuilt from the columnar cache, then loaded from the rewritten label columns
+        dataset = ds.YOLODataset(img_path=str(images), imgsz=32, augment=False, data=data)
+        assert [lb["cls"].ravel().tolist() for lb in dataset.labels] == [[0, 0], [1], [1], [0], [1], []]
+        widths = sum((lb["bboxes"][:, 2].tolist() for lb in dataset.labels), [])
+        np.testing.assert_allclose(widths, [0.2, 0.1, 0.9, 0.2, 0.3, 0.4], rtol=1e-6)
+
+
+def test_data_cache_previous():
+    """Test that labels merged from a previous cache are copies, not views of its possibly memory-mapped arrays."""
+    from ultralytics.data.dataset import YOLODataset
+
+    dataset = YOLODataset(img_path=str(TMP / "incremental/images"), imgsz=32, augment=False, data={"names": {0: "a"}})
+    previous = dataset.cache_labels(TMP / "previous.cache")
+    previous = dataset.cache_labels(TMP / "previous.cache", previous=previous)  # all labels reused
+    x = dataset.cache_labels(TMP / "previous.cache", previous=previous)
+    for old, new in zip(previous["labels"], x["labels"]):
+        assert not np.shares_memory(old["bboxes"], new["bboxes"])
+        assert np.array_equal(old["bboxes"], new["bboxes"]) and np.array_equal(old["cls"], new["cls"])
+
+
+def test_data_cache_shm():
+    """Test that cache='shm' packs all resized images into one shared buffer."""
+    from ultralytics.data.dataset import YOLODataset
+
+    images, labels = TMP / "shm/images", TMP / "shm/labels"
+    images.mkdir(parents=True, exist_ok=True)
+    labels.mkdir(parents=True, exist_ok=True)
+    for i, shape in enumerate([(40, 64, 3), (64, 20, 3), (32, 32, 3)]):
+        cv2.imwrite(str(images / f"{i}.png"), np.full(shape, i * 50, dtype=np.uint8))
+        (labels / f"{i}.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+    dataset = YOLODataset(img_path=str(images), imgsz=32, cache="shm", augment=False, data={"names": {0: "a"}})
+    assert [im.shape[:2] for im in dataset.ims] == [(20, 32), (32, 10), (32, 32)]
+    assert all(np.shares_memory(im, np.frombuffer(dataset.shm, dtype=np.uint8)) for im in dataset.ims)
+    assert dataset.load_image(1)[0][0, 0, 0] == 50
+
+
+@pytest.mark.parametrize("cache", ["mmap", "png"])
+def test_data_cache_resized(cache):
+    """Test the disk caches that store images already resized to imgsz."""
+    from ultralytics.data.dataset import YOLODataset
+
+    images = TMP / "shm/images"  # created by test_data_cache_shm()
+    data = {"names": {0: "a"}}
+    for _ in range(2):  # create, then reuse the cache
+        dataset = YOLODataset(img_path=str(images), imgsz=32, cache=cache, augment=False, data=data)
+    ims = [dataset.load_image(i) for i in range(3)]
+    assert [im.shape[:2] for im, _, _ in ims] == [(20, 32), (32, 10), (32, 32)]
+    assert [hw0 for _, hw0, _ in ims] == [(40, 64), (64, 20), (32, 32)]
+    assert ims[1][0][0, 0, 0] == 50
+    if cache == "png":  # stretched from the original image, not from the cached resized one
+        noise, labels = TMP / "png_rect/images", TMP / "png_rect/labels"
+        noise.mkdir(parents=True, exist_ok=True)
+        labels.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(noise / "0.png"), np.random.randint(0, 255, (64, 20, 3), dtype=np.uint8))
+        (labels / "0.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+        dataset = YOLODataset(img_path=str(noise), imgsz=32, cache=cache, augment=False, data=data)
+        original = cv2.resize(cv2.imread(str(noise / "0.png")), (32, 32), interpolation=cv2.INTER_LINEAR)
+        assert np.array_equal(dataset.load_image(0, rect_mode=False)[0], original)
+
+    class SquareDataset(YOLODataset):
+        def load_image(self, i, rect_mode=False):
+            return super().load_image(i, rect_mode)
+
+    dataset = SquareDataset(img_path=str(images), imgsz=32, cache=cache, augment=False, data=data)  # new cache key
+    assert all(dataset.load_image(i)[0].shape[:2] == (32, 32) for i in range(3))
+
+
+def test_dataloader_update():
+    """Test that InfiniteDataLoader.update() changes the dataset in the running workers without restarting them."""
+    from ultralytics.data.augment import Compose, Format, LetterBox
+    from ultralytics.data.build import InfiniteDataLoader
+    from ultralytics.data.dataset import YOLODataset
+
+    images = TMP / "shm/images"  # created by test_data_cache_shm()
+    dataset = YOLODataset(img_path=str(images), imgsz=32, augment=False, data={"names": {0: "a"}})
+    loader = InfiniteDataLoader(dataset, batch_size=3, num_workers=2, collate_fn=dataset.collate_fn)
+    workers = [w.pid for w in loader.iterator._workers]
+    assert next(iter(loader))["img"].shape[2:] == (32, 32)
+    loader.update("__setattr__", "transforms", Compose([LetterBox(new_shape=(16, 16)), Format()]))
+    assert all(batch["img"].shape[2:] == (16, 16) for _ in range(4) for batch in loader)
+    assert [w.pid for w in loader.iterator._workers] == workers
+    assert dataset.updates == len(loader.batch_sampler.updates) == 1  # new workers of reset() do not replay it
+    loader.reset()
+    assert all(batch["img"].shape[2:] == (16, 16) for batch in loader)
+
+
+def test_mosaic_perspective():
+    """Test that the fused MosaicPerspective transform gives the labels of Mosaic followed by RandomPerspective."""
+    import random
+
+    from ultralytics.data.augment import Compose, Mosaic, MosaicPerspective, RandomPerspective
+    from ultralytics.data.dataset import YOLODataset
+
+    images = TMP / "shm/images"  # created by test_data_cache_shm()
+    dataset = YOLODataset(img_path=str(images), imgsz=32, augment=False, data={"names": {0: "a"}})
+    dataset.buffer = [0, 1, 2]
+    for seed in range(8):
+        results = []
+        for transform in (
+            Compose([Mosaic(dataset, imgsz=32), RandomPerspective(degrees=10, shear=2)]),
+            MosaicPerspective(dataset, imgsz=32, perspective=RandomPerspective(degrees=10, shear=2)),
+        ):
+            random.seed(seed)
+            results.append(transform(dataset.get_image_and_label(seed % 3)))
+        a, b = results
+        assert a["img"].shape == b["img"].shape == (32, 32, 3)
+        assert np.allclose(a["instances"].bboxes, b["instances"].bboxes) and np.array_equal(a["cls"], b["cls"])
+
+
 def test_data_annotator():
     """Test automatic data annotation."""
     from ultralytics.data.annotator import auto_annotate
@@ -501,6 +1029,37 @@ def test_utils_ops():
     torch.allclose(boxes, xyxyxyxy2xywhr(xywhr2xyxyxyxy(boxes)), rtol=1e-3)
 
 
+def test_utils_ops_v10postprocess_batch():
+    """Test that the batched YOLOv10 postprocess matches v10postprocess() with per-image filtering and scaling."""
+    from ultralytics.utils.ops import scale_boxes, v10postprocess, v10postprocess_batch, xywh2xyxy
+
+    preds = torch.cat([torch.rand(2, 500, 2) * 64, torch.rand(2, 500, 2) * 16, torch.rand(2, 500, 3)], -1)
+    shapes = [(48, 64), (80, 40)]
+    dets, counts = v10postprocess_batch(preds, 100, 3, conf=0.9, img1_shape=(64, 64), img0_shapes=shapes)
+    boxes, scores, labels = v10postprocess(preds, 100, 3)
+    for i, shape in enumerate(shapes):
+        keep = scores[i] > 0.9
+        assert counts[i] == keep.sum() and not dets[i, counts[i] :].any()
+        assert torch.allclose(dets[i, : counts[i], :4], scale_boxes((64, 64), xywh2xyxy(boxes[i][keep]), shape))
+        assert torch.equal(dets[i, : counts[i], 5].long(), labels[i][keep])
+
+
+def test_utils_instance():
+    """Test that Instances composes the scales, offsets and flips of segments and keypoints and applies them once."""
+    from ultralytics.utils.instance import Instances
+
+    segments, keypoints = np.random.rand(3, 10, 2).astype(np.float32), np.random.rand(3, 5, 3).astype(np.float32)
+    instances = Instances(np.random.rand(3, 4).astype(np.float32), segments.copy(), keypoints.copy())
+    instances.denormalize(64, 48)
+    instances.add_padding(4, 2)
+    instances.fliplr(72)
+    assert np.array_equal(instances.deferred()[0], segments)  # not applied yet
+    assert np.allclose(instances.segments[..., 0], 72 - (segments[..., 0] * 64 + 4))
+    assert np.allclose(instances.keypoints[..., 1], keypoints[..., 1] * 48 + 2)
+    assert np.array_equal(instances.keypoints[..., 2], keypoints[..., 2])
+    assert np.array_equal(instances.deferred()[2], np.eye(3))
+
+
 def test_utils_files():
     """Test file handling utilities."""
     from ultralytics.utils.files import file_age, file_date, get_latest_run, spaces_in_path
@@ -564,6 +1123,20 @@ def test_nn_modules_block():
     BottleneckCSP(c1, c2)(x)
 
 
+def test_nn_modules_v10detect_one2one_only():
+    """Test that v10Detect skips the one2many branch at inference without changing the one2one predictions."""
+    from ultralytics.nn.modules.head import v10Detect
+
+    m = v10Detect(nc=4, ch=(8, 16)).eval()
+    m.stride = torch.tensor([8.0, 16.0])
+    x = [torch.rand(2, 8, 8, 8), torch.rand(2, 16, 4, 4)]
+    y = m(x)
+    m.one2one_only = True
+    y1 = m(x)
+    assert "one2many" in y and list(y1) == ["one2one"]
+    assert torch.allclose(y["one2one"][0], y1["one2one"][0])
+
+
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 def test_hub():
     """Test Ultralytics HUB functionalities."""
@@ -643,3 +1216,33 @@ def test_yolo_world():
     model = YOLO("yolov8s-world.pt")  # no YOLOv8n-world model yet
     model.set_classes(["tree", "window"])
     model(ASSETS / "bus.jpg", conf=0.01)
+
+
+def test_train_model_save_callback():
+    """Test that on_model_save callbacks can read the checkpoint saved in the background."""
+    model, epochs = YOLO(CFG), []
+
+    def on_model_save(trainer):
+        epochs.append(torch.load(trainer.last, weights_only=False)["epoch"])
+
+    model.add_callback("on_model_save", on_model_save)
+    model.train(data="coco8.yaml", epochs=2, imgsz=32, cache="disk", batch=-1, close_mosaic=1, name="model_save")
+    assert epochs == [0, 1]
+
+
+def test_checkpoint_writer():
+    """Test that CheckpointWriter writes FP16 model snapshots to all files in the background."""
+    from ultralytics.nn.tasks import DetectionModel
+    from ultralytics.utils.torch_utils import CheckpointWriter, half_copy
+
+    model = DetectionModel("yolov8n.yaml", verbose=False)
+    files = TMP / "ckpt_last.pt", TMP / "ckpt_best.pt"
+    writer = CheckpointWriter()
+    writer.save({"epoch": 0, "model": half_copy(model)}, *files)
+    writer.save({"epoch": 1, "model": half_copy(model)}, *files)  # waits for the first checkpoint
+    writer.close()
+    assert files[0].read_bytes() == files[1].read_bytes()
+    ckpt = torch.load(files[0], weights_only=False)
+    assert ckpt["epoch"] == 1
+    for k, v in deepcopy(model).half().state_dict().items():
+        assert torch.equal(ckpt["model"].state_dict()[k], v)
@@ -95,7 +95,7 @@ CLI_HELP_MSG = f"""
     """
 
 # Define keys for arg type checks
-CFG_FLOAT_KEYS = {"warmup_epochs", "box", "cls", "dfl", "degrees", "shear", "time"}
+CFG_FLOAT_KEYS = {"warmup_epochs", "box", "cls", "dfl", "degrees", "shear", "time", "stream_wait"}
 CFG_FRACTION_KEYS = {
     "dropout",
     "iou",
@@ -132,6 +132,8 @@ CFG_INT_KEYS = {
     "mask_ratio",
     "max_det",
     "vid_stride",
+    "prefetch",
+    "pipeline",
     "line_width",
     "workspace",
     "nbs",
@@ -172,6 +174,7 @@ CFG_BOOL_KEYS = {
     "nms",
     "profile",
     "multi_scale",
+    "batch_augment",
 }
 
 
@@ -13,7 +13,8 @@ from ultralytics.utils import LOGGER, colorstr
 from ultralytics.utils.checks import check_version
 from ultralytics.utils.instance import Instances
 from ultralytics.utils.metrics import bbox_ioa
-from ultralytics.utils.ops import segment2box, xyxyxyxy2xywhr
+from ultralytics.utils.ops import xywh2xyxy, xyxy2xywh, xyxyxyxy2xywhr
+from ultralytics.utils.tal import TORCH_1_10
 from ultralytics.utils.torch_utils import TORCHVISION_0_10, TORCHVISION_0_11, TORCHVISION_0_13
 from .utils import polygons2masks, polygons2masks_overlap
 
@@ -209,16 +210,30 @@ class Mosaic(BaseMixTransform):
         """Create a 2x2 image mosaic."""
         mosaic_labels = []
         s = self.imgsz
+        for i, (labels_patch, (x1a, y1a, x2a, y2a), (x1b, y1b, x2b, y2b)) in enumerate(self._tiles4(labels)):
+            img = labels_patch["img"]
+            if i == 0:
+                img4 = np.full((s * 2, s * 2, img.shape[2]), 114, dtype=np.uint8)  # base image with 4 tiles
+            img4[y1a:y2a, x1a:x2a] = img[y1b:y2b, x1b:x2b]  # img4[ymin:ymax, xmin:xmax]
+            padw = x1a - x1b
+            padh = y1a - y1b
+
+            labels_patch = self._update_labels(labels_patch, padw, padh)
+            mosaic_labels.append(labels_patch)
+        final_labels = self._cat_labels(mosaic_labels)
+        final_labels["img"] = img4
+        return final_labels
+
+    def _tiles4(self, labels):
+        """Yields the labels and the mosaic and image xyxy coordinates of each tile of a 2x2 mosaic."""
+        s = self.imgsz
         yc, xc = (int(random.uniform(-x, 2 * s + x)) for x in self.border)  # mosaic center x, y
         for i in range(4):
             labels_patch = labels if i == 0 else labels["mix_labels"][i - 1]
-            # Load image
-            img = labels_patch["img"]
             h, w = labels_patch.pop("resized_shape")
 
             # Place img in img4
             if i == 0:  # top left
-                img4 = np.full((s * 2, s * 2, img.shape[2]), 114, dtype=np.uint8)  # base image with 4 tiles
                 x1a, y1a, x2a, y2a = max(xc - w, 0), max(yc - h, 0), xc, yc  # xmin, ymin, xmax, ymax (large image)
                 x1b, y1b, x2b, y2b = w - (x2a - x1a), h - (y2a - y1a), w, h  # xmin, ymin, xmax, ymax (small image)
             elif i == 1:  # top right
@@ -230,16 +245,7 @@ class Mosaic(BaseMixTransform):
             elif i == 3:  # bottom right
                 x1a, y1a, x2a, y2a = xc, yc, min(xc + w, s * 2), min(s * 2, yc + h)
                 x1b, y1b, x2b, y2b = 0, 0, min(w, x2a - x1a), min(y2a - y1a, h)
-
-            img4[y1a:y2a, x1a:x2a] = img[y1b:y2b, x1b:x2b]  # img4[ymin:ymax, xmin:xmax]
-            padw = x1a - x1b
-            padh = y1a - y1b
-
-            labels_patch = self._update_labels(labels_patch, padw, padh)
-            mosaic_labels.append(labels_patch)
-        final_labels = self._cat_labels(mosaic_labels)
-        final_labels["img"] = img4
-        return final_labels
+            yield labels_patch, (x1a, y1a, x2a, y2a), (x1b, y1b, x2b, y2b)
 
     def _mosaic9(self, labels):
         """Create a 3x3 image mosaic."""
@@ -323,6 +329,73 @@ class Mosaic(BaseMixTransform):
         return final_labels
 
 
+class MosaicPerspective(Mosaic):
+    """
+    2x2 Mosaic followed by RandomPerspective, warping each tile directly into the output image.
+
+    Instead of copying the four tiles into a 2*imgsz mosaic canvas and warping the canvas down to imgsz, the placement
+    of each tile is composed with the random perspective matrix and the tile is warped into its footprint of the imgsz
+    output. The random draws and the labels are the same as with Mosaic and RandomPerspective applied in sequence, the
+    images only differ in the interpolation along the one pixel wide seams between tiles.
+
+    Attributes:
+        perspective (RandomPerspective): The perspective transform, also applied alone to the samples without mosaic.
+    """
+
+    def __init__(self, dataset, imgsz=640, p=1.0, perspective=None):
+        """Initializes the object with a dataset, image size, mosaic probability and the RandomPerspective transform."""
+        super().__init__(dataset=dataset, imgsz=imgsz, p=p, n=4)
+        self.perspective = perspective
+
+    def __call__(self, labels):
+        """Applies the fused mosaic and perspective transform, or only the perspective transform without mosaic."""
+        if random.uniform(0, 1) > self.p:
+            return self.perspective(labels)
+        labels["mix_labels"] = [self.dataset.get_image_and_label(i) for i in self.get_indexes()]
+        return self._mix_transform(labels)
+
+    def _mix_transform(self, labels):
+        """Warps the tiles of a 2x2 mosaic into the output image and transforms their labels."""
+        assert labels.get("rect_shape", None) is None, "rect and mosaic are mutually exclusive."
+        assert len(labels.get("mix_labels", [])), "There are no other images for mosaic augment."
+        mosaic_labels, tiles = [], []
+        for labels_patch, (x1a, y1a, x2a, y2a), (x1b, y1b, x2b, y2b) in self._tiles4(labels):
+            tiles.append((labels_patch["img"][y1b:y2b, x1b:x2b], x1a, y1a))
+            mosaic_labels.append(self._update_labels(labels_patch, x1a - x1b, y1a - y1b))
+        final_labels = self._cat_labels(mosaic_labels)
+        final_labels.pop("mosaic_border")
+
+        s, perspective = self.imgsz, self.perspective
+        perspective.size = s, s  # w, h
+        M, scale = perspective.affine_matrix(s * 2, s * 2)
+        img = np.full((s, s, tiles[0][0].shape[2]), 114, dtype=np.uint8)
+        for tile, x, y in tiles:
+            self._warp_tile(img, tile, M @ np.array([[1, 0, x], [0, 1, y], [0, 0, 1]], dtype=np.float32))
+        final_labels["img"] = img
+        return perspective.apply_instances(final_labels, M, scale)
+
+    def _warp_tile(self, img, tile, M):
+        """Warps a tile with the matrix M into the region of the output image it covers, in place."""
+        h, w = tile.shape[:2]
+        if h == 0 or w == 0:
+            return
+        xy = np.array([[0, 0, 1], [w, 0, 1], [0, h, 1], [w, h, 1]], dtype=np.float32) @ M.T
+        if (xy[:, 2] <= 0).any():  # corners behind the perspective horizon, warp into the whole image
+            x0, y0, x1, y1 = 0, 0, img.shape[1], img.shape[0]
+        else:
+            xy = xy[:, :2] / xy[:, 2:3]
+            x0, y0 = np.clip(np.floor(xy.min(0)) - 1, 0, img.shape[1::-1]).astype(int)
+            x1, y1 = np.clip(np.ceil(xy.max(0)) + 1, 0, img.shape[1::-1]).astype(int)
+            if x1 <= x0 or y1 <= y0:  # tile outside the image
+                return
+        M = np.array([[1, 0, -x0], [0, 1, -y0], [0, 0, 1]], dtype=np.float32) @ M
+        dst = img[y0:y1, x0:x1]  # warped in place, pixels outside the tile are left untouched
+        if self.perspective.perspective:
+            cv2.warpPerspective(tile, M, dsize=(x1 - x0, y1 - y0), dst=dst, borderMode=cv2.BORDER_TRANSPARENT)
+        else:  # affine
+            cv2.warpAffine(tile, M[:2], dsize=(x1 - x0, y1 - y0), dst=dst, borderMode=cv2.BORDER_TRANSPARENT)
+
+
 class MixUp(BaseMixTransform):
     """Class for applying MixUp augmentation to the dataset."""
 
@@ -394,12 +467,33 @@ class RandomPerspective:
             M (ndarray): Transformation matrix.
             s (float): Scale factor.
         """
+        M, s = self.affine_matrix(img.shape[1], img.shape[0])
+        # Affine image
+        if (border[0] != 0) or (border[1] != 0) or (M != np.eye(3)).any():  # image changed
+            if self.perspective:
+                img = cv2.warpPerspective(img, M, dsize=self.size, borderValue=(114, 114, 114))
+            else:  # affine
+                img = cv2.warpAffine(img, M[:2], dsize=self.size, borderValue=(114, 114, 114))
+        return img, M, s
+
+    def affine_matrix(self, w, h):
+        """
+        Draws a random transformation matrix for an image of the given size, centered around the image center.
+
+        Args:
+            w (int): Input image width.
+            h (int): Input image height.
+
+        Returns:
+            M (ndarray): Transformation matrix.
+            s (float): Scale factor.
+        """
 
         # Center
         C = np.eye(3, dtype=np.float32)
 
-        C[0, 2] = -img.shape[1] / 2  # x translation (pixels)
-        C[1, 2] = -img.shape[0] / 2  # y translation (pixels)
+        C[0, 2] = -w / 2  # x translation (pixels)
+        C[1, 2] = -h / 2  # y translation (pixels)
 
         # Perspective
         P = np.eye(3, dtype=np.float32)
@@ -426,13 +520,7 @@ class RandomPerspective:
 
         # Combined rotation matrix
         M = T @ S @ R @ P @ C  # order of operations (right to left) is IMPORTANT
-        # Affine image
-        if (border[0] != 0) or (border[1] != 0) or (M != np.eye(3)).any():  # image changed
-            if self.perspective:
-                img = cv2.warpPerspective(img, M, dsize=self.size, borderValue=(114, 114, 114))
-            else:  # affine
-                img = cv2.warpAffine(img, M[:2], dsize=self.size, borderValue=(114, 114, 114))
-        return img, M, s
+        return M, s
 
     def apply_bboxes(self, bboxes, M):
         """
@@ -475,16 +563,35 @@ class RandomPerspective:
         if n == 0:
             return [], segments
 
-        xy = np.ones((n * num, 3), dtype=segments.dtype)
-        segments = segments.reshape(-1, 2)
-        xy[:, :2] = segments
-        xy = xy @ M.T  # transform
-        xy = xy[:, :2] / xy[:, 2:3]
-        segments = xy.reshape(n, -1, 2)
-        bboxes = np.stack([segment2box(xy, self.size[0], self.size[1]) for xy in segments], 0)
-        segments[..., 0] = segments[..., 0].clip(bboxes[:, 0:1], bboxes[:, 2:3])
-        segments[..., 1] = segments[..., 1].clip(bboxes[:, 1:2], bboxes[:, 3:4])
-        return bboxes, segments
+        x, y = segments[..., 0], segments[..., 1]
+        xt = M[0, 0] * x + M[0, 1] * y + M[0, 2]  # transform, into contiguous x and y arrays
+        yt = M[1, 0] * x + M[1, 1] * y + M[1, 2]
+        if self.perspective:  # perspective rescale
+            z = M[2, 0] * x + M[2, 1] * y + M[2, 2]
+            xt /= z
+            yt /= z
+
+        # Boxes of the points inside the image as segment2box(), computed only for segments not fully inside
+        w, h = self.size
+        bboxes = np.stack((xt.min(1), yt.min(1), xt.max(1), yt.max(1)), 1)
+        j = ((bboxes[:, :2] < 0) | (bboxes[:, 2:] > (w, h))).any(1).nonzero()[0]
+        if len(j):
+            x, y = xt[j], yt[j]
+            inside = (x >= 0) & (y >= 0) & (x <= w) & (y <= h)
+            bboxes[j] = np.stack(
+                (
+                    np.where(inside, x, np.inf).min(1),
+                    np.where(inside, y, np.inf).min(1),
+                    np.where(inside, x, -np.inf).max(1),
+                    np.where(inside, y, -np.inf).max(1),
+                ),
+                1,
+            )
+            bboxes[j[~inside.any(1)]] = 0
+        bboxes[(bboxes[:, 0] == 0) & (bboxes[:, 2] == 0)] = 0  # all x 0, as segment2box()
+        np.clip(xt, bboxes[:, 0:1], bboxes[:, 2:3], out=xt)
+        np.clip(yt, bboxes[:, 1:2], bboxes[:, 3:4], out=yt)
+        return bboxes, np.stack((xt, yt), -1)
 
     def apply_keypoints(self, keypoints, M):
         """
@@ -521,8 +628,7 @@ class RandomPerspective:
         labels.pop("ratio_pad", None)  # do not need ratio pad
 
         img = labels["img"]
-        cls = labels["cls"]
-        instances = labels.pop("instances")
+        instances = labels["instances"]
         # Make sure the coord formats are right
         instances.convert_bbox(format="xyxy")
         instances.denormalize(*img.shape[:2][::-1])
@@ -531,18 +637,33 @@ class RandomPerspective:
         self.size = img.shape[1] + border[1] * 2, img.shape[0] + border[0] * 2  # w, h
         # M is affine matrix
         # Scale for func:`box_candidates`
-        img, M, scale = self.affine_transform(img, border)
+        labels["img"], M, scale = self.affine_transform(img, border)
+        return self.apply_instances(labels, M, scale)
+
+    def apply_instances(self, labels, M, scale):
+        """
+        Transforms the xyxy pixel instances of the labels with the matrix and keeps those that remain valid boxes.
 
+        Args:
+            labels (dict): Labels with the transformed 'img' and the 'instances' and 'cls' before the transform.
+            M (ndarray): Transformation matrix.
+            scale (float): Scale factor of the transformation.
+
+        Returns:
+            (dict): The labels with the transformed and filtered 'instances' and 'cls'.
+        """
+        cls = labels["cls"]
+        instances = labels.pop("instances")
         bboxes = self.apply_bboxes(instances.bboxes, M)
 
-        segments = instances.segments
-        keypoints = instances.keypoints
+        # Transform the points once, with any scale and offset still pending on them
+        segments, keypoints, P = instances.deferred()
         # Update bboxes if there are segments.
         if len(segments):
-            bboxes, segments = self.apply_segments(segments, M)
+            bboxes, segments = self.apply_segments(segments, M @ P)
 
         if keypoints is not None:
-            keypoints = self.apply_keypoints(keypoints, M)
+            keypoints = self.apply_keypoints(keypoints, M @ P)
         new_instances = Instances(bboxes, segments, keypoints, bbox_format="xyxy", normalized=False)
         # Clip
         new_instances.clip(*self.size)
@@ -555,8 +676,7 @@ class RandomPerspective:
         )
         labels["instances"] = new_instances[i]
         labels["cls"] = cls[i]
-        labels["img"] = img
-        labels["resized_shape"] = img.shape[:2]
+        labels["resized_shape"] = labels["img"].shape[:2]
         return labels
 
     def box_candidates(self, box1, box2, wh_thr=2, ar_thr=100, area_thr=0.1, eps=1e-16):
@@ -700,6 +820,54 @@ class LetterBox:
         img = labels.get("img") if image is None else image
         shape = img.shape[:2]  # current shape [height, width]
         new_shape = labels.pop("rect_shape", self.new_shape)
+        if isinstance(new_shape, int):
+            new_shape = (new_shape, new_shape)
+        ratio, new_unpad, (dw, dh), (top, bottom, left, right) = self._params(shape, new_shape)
+
+        if shape[::-1] != new_unpad:  # resize
+            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+        img = cv2.copyMakeBorder(
+            img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
+        )  # add border
+        if labels.get("ratio_pad"):
+            labels["ratio_pad"] = (labels["ratio_pad"], (left, top))  # for evaluation
+
+        if len(labels):
+            labels = self._update_labels(labels, ratio, dw, dh)
+            labels["img"] = img
+            labels["resized_shape"] = new_shape
+            return labels
+        else:
+            return img
+
+    def batch(self, ims, out=None):
+        """
+        Letterboxes a list of images of one shape into a single (n, h, w, 3) array, computing the geometry once and
+        resizing each image directly into it.
+
+        Args:
+            ims (List[np.ndarray]): Images of the same shape.
+            out (np.ndarray, optional): Array returned by a previous call for images of the same shape and number,
+                written into without refilling its border. Defaults to None, a new array is allocated.
+
+        Returns:
+            (np.ndarray): The letterboxed images, 'out' if given.
+        """
+        shape = ims[0].shape[:2]
+        _, (w, h), _, (top, bottom, left, right) = self._params(shape)
+        if out is None:
+            out = np.full((len(ims), top + h + bottom, left + w + right, ims[0].shape[2]), 114, dtype=ims[0].dtype)
+        for im, o in zip(ims, out):
+            dst = o[top : top + h, left : left + w]
+            if shape[::-1] != (w, h):  # resize
+                cv2.resize(im, (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+            else:
+                dst[:] = im
+        return out
+
+    def _params(self, shape, new_shape=None):
+        """Returns the (w, h) ratios, resized (w, h), (w, h) padding and (top, bottom, left, right) border for a shape."""
+        new_shape = self.new_shape if new_shape is None else new_shape
         if isinstance(new_shape, int):
             new_shape = (new_shape, new_shape)
 
@@ -722,24 +890,9 @@ class LetterBox:
         if self.center:
             dw /= 2  # divide padding into 2 sides
             dh /= 2
-
-        if shape[::-1] != new_unpad:  # resize
-            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
         top, bottom = int(round(dh - 0.1)) if self.center else 0, int(round(dh + 0.1))
         left, right = int(round(dw - 0.1)) if self.center else 0, int(round(dw + 0.1))
-        img = cv2.copyMakeBorder(
-            img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
-        )  # add border
-        if labels.get("ratio_pad"):
-            labels["ratio_pad"] = (labels["ratio_pad"], (left, top))  # for evaluation
-
-        if len(labels):
-            labels = self._update_labels(labels, ratio, dw, dh)
-            labels["img"] = img
-            labels["resized_shape"] = new_shape
-            return labels
-        else:
-            return img
+        return ratio, new_unpad, (dw, dh), (top, bottom, left, right)
 
     def _update_labels(self, labels, ratio, padw, padh):
         """Update labels."""
@@ -970,22 +1123,190 @@ class Format:
         return masks, instances, cls
 
 
-def v8_transforms(dataset, imgsz, hyp, stretch=False):
-    """Convert images to a size suitable for YOLOv8 training."""
-    pre_transform = Compose(
-        [
-            Mosaic(dataset, imgsz=imgsz, p=hyp.mosaic),
-            CopyPaste(p=hyp.copy_paste),
-            RandomPerspective(
-                degrees=hyp.degrees,
-                translate=hyp.translate,
-                scale=hyp.scale,
-                shear=hyp.shear,
-                perspective=hyp.perspective,
-                pre_transform=None if stretch else LetterBox(new_shape=(imgsz, imgsz)),
-            ),
-        ]
+class BatchCanvas:
+    """
+    Pads the samples of a dataset to one canvas size, so that they collate into batches for BatchAugment.
+
+    Mosaics keep their (2 * imgsz, 2 * imgsz) canvas and other samples are letterboxed to 'imgsz' and centered on the
+    canvas, which leaves their RandomPerspective warp unchanged as it is centered on the image.
+
+    Attributes:
+        size (int): Canvas size, 2 * imgsz with mosaic and imgsz without.
+        letterbox (LetterBox): Letterbox of samples without mosaic.
+    """
+
+    def __init__(self, imgsz, mosaic=True):
+        """Initializes the canvas for mosaics of 'imgsz' images if 'mosaic', else for 'imgsz' images."""
+        self.size = imgsz * 2 if mosaic else imgsz
+        self.letterbox = LetterBox(new_shape=(imgsz, imgsz))
+
+    def __call__(self, labels):
+        """Letterboxes a sample without mosaic and pads it to the canvas, updating its instances."""
+        if "mosaic_border" not in labels:
+            labels = self.letterbox(labels)
+        labels.pop("mosaic_border", None)
+        labels.pop("ratio_pad", None)
+        img = labels["img"]
+        h, w = img.shape[:2]
+        if (h, w) != (self.size, self.size):
+            top, left = (self.size - h) // 2, (self.size - w) // 2
+            bottom, right = self.size - h - top, self.size - w - left
+            img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+            labels["img"] = img
+            labels["instances"].convert_bbox(format="xyxy")
+            labels["instances"].denormalize(w, h)
+            labels["instances"].add_padding(left, top)
+        labels["resized_shape"] = img.shape[:2]
+        return labels
+
+
+class BatchAugment:
+    """
+    Applies the RandomPerspective, RandomHSV and RandomFlip augmentations to a collated detection batch at once.
+
+    The images of the batch are warped with one grid_sample call on the training device, HSV gains are applied with
+    tensor ops and flips with torch.where, with random parameters drawn per image. Boxes are transformed, clipped and
+    filtered as in RandomPerspective. Samples are padded to one canvas size by BatchCanvas in the dataset workers.
+
+    Attributes:
+        imgsz (int): Output image size.
+        degrees, translate, scale, shear, perspective (float): RandomPerspective parameters.
+        hgain, sgain, vgain (float): RandomHSV gains.
+        flipud, fliplr (float): Probabilities of vertical and horizontal flips.
+
+    Example:
+        ```python
+        augment = BatchAugment(640, hyp)
+        batch['img'] = batch['img'].to(device).float() / 255
+        batch = augment(batch)
+        ```
+    """
+
+    def __init__(self, imgsz, hyp):
+        """Initializes the augmentations for 'imgsz' output images with the hyperparameters of 'hyp'."""
+        self.imgsz = imgsz
+        self.degrees, self.translate, self.scale = hyp.degrees, hyp.translate, hyp.scale
+        self.shear, self.perspective = hyp.shear, hyp.perspective
+        self.hgain, self.sgain, self.vgain = hyp.hsv_h, hyp.hsv_s, hyp.hsv_v
+        self.flipud, self.fliplr = hyp.flipud, hyp.fliplr
+
+    def __call__(self, batch):
+        """
+        Augments a batch of float images in [0, 1] on any device and its boxes.
+
+        Args:
+            batch (dict): Collated batch with 'img' (B, 3, H, W), 'bboxes' (N, 4) normalized xywh, 'cls' and
+                'batch_idx'.
+
+        Returns:
+            (dict): The batch with (B, 3, imgsz, imgsz) images and the remaining boxes normalized to them.
+        """
+        img, bboxes, idx = batch["img"], batch["bboxes"], batch["batch_idx"].long()
+        b, _, h, w = img.shape
+        M, s = self.affine_matrices(b, w, h)
+        img = self.warp(img, M.to(img.device))
+        bboxes = xywh2xyxy(bboxes) * bboxes.new_tensor([w, h, w, h])
+        new = self.apply_bboxes(bboxes, M[idx]).clamp_(0, self.imgsz)
+        i = self.box_candidates(bboxes * s[idx, None], new)
+        bboxes, idx = xyxy2xywh(new[i]) / self.imgsz, idx[i]
+        batch["cls"], batch["batch_idx"] = batch["cls"][i], batch["batch_idx"][i]
+
+        if self.hgain or self.sgain or self.vgain:
+            gains = torch.empty(b, 3).uniform_(-1, 1) * torch.tensor([self.hgain, self.sgain, self.vgain]) + 1
+            img = self.hsv(img, gains.to(img.device))
+        for p, dim, k in (self.flipud, 2, 1), (self.fliplr, 3, 0):
+            flip = torch.rand(b) < p
+            if flip.any():
+                img = torch.where(flip.to(img.device)[:, None, None, None], img.flip(dim), img)
+                bboxes[flip[idx], k] = 1 - bboxes[flip[idx], k]
+        batch["img"], batch["bboxes"] = img, bboxes
+        return batch
+
+    def affine_matrices(self, n, w, h):
+        """Returns n random (3, 3) matrices from (w, h) canvases to the output, as in RandomPerspective, and scales."""
+        C = torch.eye(3).repeat(n, 1, 1)
+        C[:, 0, 2], C[:, 1, 2] = -w / 2, -h / 2  # x, y translation to the center (pixels)
+        P = torch.eye(3).repeat(n, 1, 1)
+        P[:, 2, :2] = torch.empty(n, 2).uniform_(-self.perspective, self.perspective)  # x, y perspective
+        a = torch.empty(n).uniform_(-self.degrees, self.degrees) * math.pi / 180  # rotation
+        s = torch.empty(n).uniform_(1 - self.scale, 1 + self.scale)  # scale
+        R = torch.eye(3).repeat(n, 1, 1)
+        R[:, 0, 0], R[:, 0, 1], R[:, 1, 0], R[:, 1, 1] = s * a.cos(), s * a.sin(), -s * a.sin(), s * a.cos()
+        S = torch.eye(3).repeat(n, 1, 1)
+        S[:, 0, 1], S[:, 1, 0] = (torch.empty(2, n).uniform_(-self.shear, self.shear) * math.pi / 180).tan()  # shear
+        T = torch.eye(3).repeat(n, 1, 1)
+        T[:, :2, 2] = torch.empty(n, 2).uniform_(0.5 - self.translate, 0.5 + self.translate) * self.imgsz
+        return T @ S @ R @ P @ C, s  # order of operations (right to left) is IMPORTANT
+
+    def warp(self, img, M):
+        """Warps (B, 3, H, W) images with (B, 3, 3) matrices to (B, 3, imgsz, imgsz), padding with 114 like OpenCV."""
+        b, _, h, w = img.shape
+        r = torch.arange(self.imgsz, device=img.device)
+        y, x = torch.meshgrid(r, r, indexing="ij") if TORCH_1_10 else torch.meshgrid(r, r)
+        xy = torch.stack((x, y, torch.ones_like(x)), -1).to(img.dtype).view(1, -1, 3)  # output pixel centers
+        xy = xy @ torch.linalg.inv(M).transpose(1, 2)  # source pixels of each output pixel
+        xy = xy[..., :2] / xy[..., 2:]
+        grid = (xy * 2 + 1) / xy.new_tensor([w, h]) - 1  # grid_sample coordinates, align_corners=False
+        pad = 114 / 255
+        out = torch.nn.functional.grid_sample(img - pad, grid.view(b, self.imgsz, self.imgsz, 2), align_corners=False)
+        return out + pad
+
+    def apply_bboxes(self, bboxes, M):
+        """Transforms (N, 4) xyxy boxes with their (N, 3, 3) matrices and returns the xyxy boxes of their corners."""
+        xy = bboxes[:, [0, 1, 2, 3, 0, 3, 2, 1]].view(-1, 4, 2)  # x1y1, x2y2, x1y2, x2y1
+        xy = torch.cat((xy, torch.ones_like(xy[..., :1])), -1) @ M.transpose(1, 2)
+        xy = xy[..., :2] / xy[..., 2:]  # perspective rescale or affine
+        return torch.cat((xy.min(1)[0], xy.max(1)[0]), 1)
+
+    @staticmethod
+    def box_candidates(box1, box2, wh_thr=2, ar_thr=100, area_thr=0.1, eps=1e-16):
+        """Returns which (N, 4) xyxy boxes to keep after augmentation, see RandomPerspective.box_candidates()."""
+        w1, h1 = box1[:, 2] - box1[:, 0], box1[:, 3] - box1[:, 1]
+        w2, h2 = box2[:, 2] - box2[:, 0], box2[:, 3] - box2[:, 1]
+        ar = torch.maximum(w2 / (h2 + eps), h2 / (w2 + eps))  # aspect ratio
+        return (w2 > wh_thr) & (h2 > wh_thr) & (w2 * h2 / (w1 * h1 + eps) > area_thr) & (ar < ar_thr)  # candidates
+
+    @staticmethod
+    def hsv(img, gains):
+        """Multiplies the hue, saturation and value of (B, 3, H, W) RGB images in [0, 1] by (B, 3) gains."""
+        maxc, argmax = img.max(1)
+        delta = maxc - img.min(1)[0]
+        r, g, b = img.unbind(1)
+        d = delta.clamp(min=1e-8)
+        hue = torch.stack(((g - b) / d, (b - r) / d + 2, (r - g) / d + 4), 1).gather(1, argmax[:, None])[:, 0]
+        hue = (hue % 6 / 6 * gains[:, 0, None, None]) % 1.0  # hue in [0, 1)
+        sat = (delta / maxc.clamp(min=1e-8) * gains[:, 1, None, None]).clamp_(0, 1)
+        val = (maxc * gains[:, 2, None, None]).clamp_(0, 1)
+        k = (torch.tensor([5.0, 3.0, 1.0], device=img.device)[None, :, None, None] + hue[:, None] * 6) % 6
+        return val[:, None] - val[:, None] * sat[:, None] * torch.clamp(torch.minimum(k, 4 - k), 0, 1)
+
+
+def v8_transforms(dataset, imgsz, hyp, stretch=False, batch=False):
+    """
+    Convert images to a size suitable for YOLOv8 training.
+
+    With 'batch' the RandomPerspective, RandomHSV and RandomFlip augmentations are left to BatchAugment and samples
+    are padded to one canvas size by BatchCanvas instead. Without CopyPaste, Mosaic and RandomPerspective are fused into
+    MosaicPerspective.
+    """
+    perspective = RandomPerspective(
+        degrees=hyp.degrees,
+        translate=hyp.translate,
+        scale=hyp.scale,
+        shear=hyp.shear,
+        perspective=hyp.perspective,
+        pre_transform=None if stretch else LetterBox(new_shape=(imgsz, imgsz)),
     )
+    if batch or (hyp.copy_paste and dataset.use_segments):
+        pre_transform = Compose(
+            [
+                Mosaic(dataset, imgsz=imgsz, p=hyp.mosaic),
+                CopyPaste(p=hyp.copy_paste),
+                BatchCanvas(imgsz, mosaic=hyp.mosaic > 0) if batch else perspective,
+            ]
+        )
+    else:  # CopyPaste only changes samples with segments
+        pre_transform = Compose([MosaicPerspective(dataset, imgsz=imgsz, p=hyp.mosaic, perspective=perspective)])
     flip_idx = dataset.data.get("flip_idx", [])  # for keypoints augmentation
     if dataset.use_keypoints:
         kpt_shape = dataset.data.get("kpt_shape", None)
@@ -995,6 +1316,8 @@ def v8_transforms(dataset, imgsz, hyp, stretch=False):
         elif flip_idx and (len(flip_idx) != kpt_shape[0]):
             raise ValueError(f"data.yaml flip_idx={flip_idx} length must be equal to kpt_shape[0]={kpt_shape[0]}")
 
+    if batch:
+        return Compose([pre_transform, MixUp(dataset, pre_transform=pre_transform, p=hyp.mixup), Albumentations(p=1.0)])
     return Compose(
         [
             pre_transform,
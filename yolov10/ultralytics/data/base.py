@@ -1,8 +1,11 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import glob
+import inspect
 import math
+import mmap
 import os
+import pickle
 import random
 from copy import deepcopy
 from multiprocessing.pool import ThreadPool
@@ -15,7 +18,7 @@ import psutil
 from torch.utils.data import Dataset
 
 from ultralytics.utils import DEFAULT_CFG, LOCAL_RANK, LOGGER, NUM_THREADS, TQDM
-from .utils import HELP_URL, IMG_FORMATS
+from .utils import HELP_URL, IMG_FORMATS, get_hash, load_split_manifest
 
 
 class BaseDataset(Dataset):
@@ -25,7 +28,9 @@ class BaseDataset(Dataset):
     Args:
         img_path (str): Path to the folder containing images.
         imgsz (int, optional): Image size. Defaults to 640.
-        cache (bool, optional): Cache images to RAM or disk during training. Defaults to False.
+        cache (bool | str, optional): Cache images to RAM ('ram'), to RAM shared by all dataloader workers ('shm'), to
+            disk ('disk'), or resized to imgsz on disk in one memory-mapped file ('mmap') or as lossless PNG ('png')
+            during training. Defaults to False.
         augment (bool, optional): If True, data augmentation is applied. Defaults to True.
         hyp (dict, optional): Hyperparameters to apply data augmentation. Defaults to None.
         prefix (str, optional): Prefix to print in log messages. Defaults to ''.
@@ -42,8 +47,10 @@ class BaseDataset(Dataset):
         labels (list): List of label data dictionaries.
         ni (int): Number of images in the dataset.
         ims (list): List of loaded images.
-        npy_files (list): List of numpy file paths.
+        shm (mmap.mmap): Shared memory buffer holding all images for cache='shm', 'ims' are views into it.
+        npy_files (list): List of numpy file paths, *.npz archives of the PNG encoded resized images for cache='png'.
         transforms (callable): Image transformation function.
+        updates (int): Number of InfiniteDataLoader.update() calls run in this dataloader worker.
     """
 
     def __init__(
@@ -87,15 +94,18 @@ class BaseDataset(Dataset):
         self.max_buffer_length = min((self.ni, self.batch_size * 8, 1000)) if self.augment else 0
 
         # Cache images
-        if cache == "ram" and not self.check_cache_ram():
+        if cache in {"ram", "shm"} and not self.check_cache_ram(shared=cache == "shm"):
             cache = False
         self.ims, self.im_hw0, self.im_hw = [None] * self.ni, [None] * self.ni, [None] * self.ni
-        self.npy_files = [Path(f).with_suffix(".npy") for f in self.im_files]
+        self.shm = None
+        suffix = f".{self.imgsz}.png.npz" if cache == "png" else ".npy"
+        self.npy_files = [Path(f).with_suffix(suffix) for f in self.im_files]
         if cache:
             self.cache_images(cache)
 
         # Transforms
         self.transforms = self.build_transforms(hyp=hyp)
+        self.updates = 0
 
     def get_img_files(self, img_path):
         """Read image files."""
@@ -112,6 +122,8 @@ class BaseDataset(Dataset):
                         parent = str(p.parent) + os.sep
                         f += [x.replace("./", parent) if x.startswith("./") else x for x in t]  # local to global path
                         # F += [p.parent / x.lstrip(os.sep) for x in t]  # local to global path (pathlib)
+                elif p.parent.suffix == ".npz" and p.parent.is_file():  # split of a manifest, i.e. split.npz/train
+                    f += load_split_manifest(p.parent)[p.name]
                 else:
                     raise FileNotFoundError(f"{self.prefix}{p} does not exist")
             im_files = sorted(x.replace("/", os.sep) for x in f if x.split(".")[-1].lower() in IMG_FORMATS)
@@ -142,15 +154,22 @@ class BaseDataset(Dataset):
                 if keypoints is not None:
                     self.labels[i]["keypoints"] = keypoints[j]
             if self.single_cls:
-                self.labels[i]["cls"][:, 0] = 0
+                self.labels[i]["cls"] = np.zeros_like(self.labels[i]["cls"])  # labels may be read-only memory maps
 
     def load_image(self, i, rect_mode=True):
         """Loads 1 image from dataset index 'i', returns (im, resized hw)."""
         im, f, fn = self.ims[i], self.im_files[i], self.npy_files[i]
         if im is None:  # not cached in RAM
+            hw0 = None  # orig hw of an image cached resized
             if fn.exists():  # load npy
                 try:
                     im = np.load(fn)
+                    if isinstance(im, np.lib.npyio.NpzFile):  # cache='png', resized with its stored 'rect_mode'
+                        with im:
+                            if bool(im["rect_mode"]) == rect_mode:
+                                im, hw0 = cv2.imdecode(im["png"], cv2.IMREAD_COLOR), self.labels[i]["shape"]
+                            else:  # resized differently, resize the original image instead
+                                im = cv2.imread(f)  # BGR
                 except Exception as e:
                     LOGGER.warning(f"{self.prefix}WARNING ⚠️ Removing corrupt *.npy image file {fn} due to: {e}")
                     Path(fn).unlink(missing_ok=True)
@@ -160,13 +179,14 @@ class BaseDataset(Dataset):
             if im is None:
                 raise FileNotFoundError(f"Image Not Found {f}")
 
-            h0, w0 = im.shape[:2]  # orig hw
+            h0, w0 = hw0 or im.shape[:2]  # orig hw
+            h, w = im.shape[:2]
             if rect_mode:  # resize long side to imgsz while maintaining aspect ratio
-                r = self.imgsz / max(h0, w0)  # ratio
+                r = self.imgsz / max(h, w)  # ratio
                 if r != 1:  # if sizes are not equal
-                    w, h = (min(math.ceil(w0 * r), self.imgsz), min(math.ceil(h0 * r), self.imgsz))
+                    w, h = (min(math.ceil(w * r), self.imgsz), min(math.ceil(h * r), self.imgsz))
                     im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
-            elif not (h0 == w0 == self.imgsz):  # resize by stretching image to square imgsz
+            elif not (h == w == self.imgsz):  # resize by stretching image to square imgsz
                 im = cv2.resize(im, (self.imgsz, self.imgsz), interpolation=cv2.INTER_LINEAR)
 
             # Add to buffer if training with augmentations
@@ -184,33 +204,120 @@ class BaseDataset(Dataset):
     def cache_images(self, cache):
         """Cache images to memory or disk."""
         b, gb = 0, 1 << 30  # bytes of cached images, bytes per gigabytes
-        fcn = self.cache_images_to_disk if cache == "disk" else self.load_image
+        fcn = self.cache_images_to_disk if cache in {"disk", "png"} else self.load_image
+        if cache in {"shm", "mmap"}:  # all images packed into one buffer
+            shapes = self.packed_shapes()
+            offsets = np.cumsum([0] + [h * w * 3 for h, w in shapes])
+            if cache == "shm":
+                self.shm = mmap.mmap(-1, max(int(offsets[-1]), 1))  # anonymous shared memory, inherited by workers
+                packed = np.frombuffer(self.shm, dtype=np.uint8)
+            else:
+                packed_file, im_hash = self.packed_file(), get_hash(self.im_files)
+                if self.load_packed_images(packed_file, im_hash):
+                    return
+                packed = np.lib.format.open_memmap(packed_file, "w+", np.uint8, (max(int(offsets[-1]), 1),))
         with ThreadPool(NUM_THREADS) as pool:
             results = pool.imap(fcn, range(self.ni))
             pbar = TQDM(enumerate(results), total=self.ni, disable=LOCAL_RANK > 0)
+            cached = []
             for i, x in pbar:
-                if cache == "disk":
+                if cache in {"disk", "png"}:
                     b += self.npy_files[i].stat().st_size
-                else:  # 'ram'
-                    self.ims[i], self.im_hw0[i], self.im_hw[i] = x  # im, hw_orig, hw_resized = load_image(self, i)
-                    b += self.ims[i].nbytes
+                else:  # 'ram', 'shm' or 'mmap'
+                    im, hw0, hw = x  # im, hw_orig, hw_resized = load_image(self, i)
+                    if cache in {"shm", "mmap"}:
+                        if im.shape[:2] == shapes[i]:
+                            packed[offsets[i] : offsets[i + 1]] = im.ravel()
+                            im = packed[offsets[i] : offsets[i + 1]].reshape(im.shape)  # zero-copy view
+                        else:  # images of unexpected size stay private
+                            shapes[i] = (0, 0)
+                    cached.append((i, im, hw0, hw))
+                    b += im.nbytes
                 pbar.desc = f"{self.prefix}Caching images ({b / gb:.1f}GB {cache})"
             pbar.close()
+        for i, im, hw0, hw in cached:  # assign after loading, load_image() may have evicted them from the buffer
+            self.ims[i], self.im_hw0[i], self.im_hw[i] = im, hw0, hw
+        if cache == "mmap":
+            packed.flush()
+            index = {"hash": im_hash, "imgsz": self.imgsz, "rect_mode": self.cache_rect_mode()}  # cache key
+            np.savez(packed_file.with_suffix(".idx.npz"), shapes=np.array(shapes, dtype=np.int32), **index)
+            LOGGER.info(f"{self.prefix}New image cache created: {packed_file}")
+
+    def packed_file(self):
+        """Returns the path of the packed image file for cache='mmap', named after the image directory or list."""
+        p = Path(self.img_path[0] if isinstance(self.img_path, list) else self.img_path)
+        if p.parent.suffix == ".npz":  # split manifest
+            p = p.parent.with_name(f"{p.parent.stem}.{p.name}")
+        return p.parent / f"{p.stem}.{self.imgsz}.ims.npy"
+
+    def load_packed_images(self, packed_file, im_hash):
+        """Memory-maps the images of a valid packed image file, returns False if it needs to be (re)written."""
+        index_file = packed_file.with_suffix(".idx.npz")
+        try:
+            index = np.load(index_file)
+            assert str(index["hash"]) == im_hash  # identical images
+            assert int(index["imgsz"]) == self.imgsz and bool(index["rect_mode"]) == self.cache_rect_mode()  # resized
+            shapes = index["shapes"]
+            offsets = np.cumsum([0] + [h * w * 3 for h, w in shapes])
+            packed = np.load(packed_file, mmap_mode="r")
+            assert len(packed) >= offsets[-1]
+        except (FileNotFoundError, AssertionError, KeyError, ValueError, OSError):
+            index_file.unlink(missing_ok=True)  # invalidate before rewriting the packed file
+            return False
+        for i, (h, w) in enumerate(shapes.tolist()):
+            if h:  # stored
+                self.ims[i] = packed[offsets[i] : offsets[i + 1]].reshape(h, w, 3)
+                self.im_hw0[i], self.im_hw[i] = tuple(self.labels[i]["shape"]), (h, w)
+        self.buffer = random.sample(range(self.ni), self.max_buffer_length)  # no images loaded, mosaic picks from these
+        LOGGER.info(f"{self.prefix}Using image cache {packed_file} ({offsets[-1] / (1 << 30):.1f}GB mmap)")
+        return True
+
+    def cache_rect_mode(self):
+        """Returns the 'rect_mode' images are cached with, the load_image() default, e.g. False for RT-DETR datasets."""
+        return inspect.signature(self.load_image).parameters["rect_mode"].default
+
+    def packed_shapes(self):
+        """Returns the resized (h, w) of every image as load_image() produces it, from the label image shapes."""
+        if not self.cache_rect_mode():  # stretched to square
+            return [(self.imgsz, self.imgsz)] * self.ni
+        shapes = []
+        for lb in self.labels:
+            h0, w0 = lb["shape"]
+            r = self.imgsz / max(h0, w0)  # ratio
+            if r != 1:  # if sizes are not equal
+                h0, w0 = min(math.ceil(h0 * r), self.imgsz), min(math.ceil(w0 * r), self.imgsz)
+            shapes.append((h0, w0))
+        return shapes
+
+    def __getstate__(self):
+        """Drop the shared memory buffer when pickled (spawned workers), its images are then pickled as copies."""
+        state = self.__dict__.copy()
+        state["shm"] = None
+        return state
 
     def cache_images_to_disk(self, i):
-        """Saves an image as an *.npy file for faster loading."""
+        """Saves an image as an *.npy file for faster loading, or resized and PNG encoded in an *.npz if cache='png'."""
         f = self.npy_files[i]
         if not f.exists():
-            np.save(f.as_posix(), cv2.imread(self.im_files[i]), allow_pickle=False)
+            if f.suffix == ".npz":
+                rect_mode = self.cache_rect_mode()
+                im = self.load_image(i, rect_mode)[0]
+                im = cv2.imencode(".png", im, [cv2.IMWRITE_PNG_COMPRESSION, 1])[1]  # fast lossless
+                np.savez(f.as_posix(), png=im, rect_mode=rect_mode)
+            else:
+                np.save(f.as_posix(), cv2.imread(self.im_files[i]), allow_pickle=False)
 
-    def check_cache_ram(self, safety_margin=0.5):
-        """Check image caching requirements vs available memory."""
+    def check_cache_ram(self, safety_margin=0.5, shared=False):
+        """Check image caching requirements vs available memory, exact from the label image shapes if 'shared'."""
         b, gb = 0, 1 << 30  # bytes of cached images, bytes per gigabytes
-        n = min(self.ni, 30)  # extrapolate from 30 random images
-        for _ in range(n):
-            im = cv2.imread(random.choice(self.im_files))  # sample image
-            ratio = self.imgsz / max(im.shape[0], im.shape[1])  # max(h, w)  # ratio
-            b += im.nbytes * ratio**2
+        if shared:  # one shared copy of the resized images, sizes are known without reading any image
+            b, n = sum(h * w * 3 for h, w in self.packed_shapes()), self.ni
+        else:
+            n = min(self.ni, 30)  # extrapolate from 30 random images
+            for _ in range(n):
+                im = cv2.imread(random.choice(self.im_files))  # sample image
+                ratio = self.imgsz / max(im.shape[0], im.shape[1])  # max(h, w)  # ratio
+                b += im.nbytes * ratio**2
         mem_required = b * self.ni / n * (1 + safety_margin)  # GB required to cache dataset into RAM
         mem = psutil.virtual_memory()
         cache = mem_required < mem.available  # to cache or not to cache, that is the question
@@ -228,7 +335,7 @@ class BaseDataset(Dataset):
         bi = np.floor(np.arange(self.ni) / self.batch_size).astype(int)  # batch index
         nb = bi[-1] + 1  # number of batches
 
-        s = np.array([x.pop("shape") for x in self.labels])  # hw
+        s = np.array([x["shape"] for x in self.labels])  # hw
         ar = s[:, 0] / s[:, 1]  # aspect ratio
         irect = ar.argsort()
         self.im_files = [self.im_files[i] for i in irect]
@@ -252,6 +359,20 @@ class BaseDataset(Dataset):
         """Returns transformed label information for given index."""
         return self.transforms(self.get_image_and_label(index))
 
+    def __getitems__(self, indices):
+        """
+        Returns transformed label information for a batch of indices, as loaded by DataLoader workers.
+
+        First runs the dataset method calls sent along with the indices by InfiniteDataLoader.update() that this worker
+        has not run yet, so the settings of live workers can be changed without restarting them.
+        """
+        updates = getattr(indices, "updates", ())
+        for update in updates[self.updates :]:
+            method, args, kwargs = pickle.loads(update)
+            getattr(self, method)(*args, **kwargs)
+        self.updates = len(updates)
+        return [self[i] for i in indices]
+
     def get_image_and_label(self, index):
         """Get and return label information from the dataset."""
         label = deepcopy(self.labels[index])  # requires deepcopy() https://github.com/ultralytics/ultralytics/pull/1948
@@ -1,6 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import os
+import pickle
 import random
 from pathlib import Path
 
@@ -22,6 +23,7 @@ from ultralytics.data.loaders import (
 from ultralytics.data.utils import IMG_FORMATS, VID_FORMATS
 from ultralytics.utils import RANK, colorstr
 from ultralytics.utils.checks import check_file
+from ultralytics.utils.torch_utils import TORCH_2_0
 from .dataset import YOLODataset
 from .utils import PIN_MEMORY
 
@@ -31,12 +33,17 @@ class InfiniteDataLoader(dataloader.DataLoader):
     Dataloader that reuses workers.
 
     Uses same syntax as vanilla DataLoader.
+
+    Attributes:
+        received (int): Number of batches taken from the iterator.
+        stale (int): Number of batches still to skip, loaded before the last update().
     """
 
     def __init__(self, *args, **kwargs):
         """Dataloader that infinitely recycles workers, inherits from DataLoader."""
         super().__init__(*args, **kwargs)
         object.__setattr__(self, "batch_sampler", _RepeatSampler(self.batch_sampler))
+        self.received, self.stale = 0, 0
         self.iterator = super().__iter__()
 
     def __len__(self):
@@ -46,6 +53,11 @@ class InfiniteDataLoader(dataloader.DataLoader):
     def __iter__(self):
         """Creates a sampler that repeats indefinitely."""
         for _ in range(len(self)):
+            while self.stale:  # loaded with the dataset settings before update()
+                next(self.iterator)
+                self.received += 1
+                self.stale -= 1
+            self.received += 1
             yield next(self.iterator)
 
     def reset(self):
@@ -54,8 +66,34 @@ class InfiniteDataLoader(dataloader.DataLoader):
 
         This is useful when we want to modify settings of dataset while training.
         """
+        self.received, self.stale = self.batch_sampler.sent, 0
         self.iterator = self._get_iterator()
 
+    def update(self, method, *args, **kwargs):
+        """
+        Calls a dataset method that changes its settings, i.e. close_mosaic(), here and in the running workers.
+
+        Instead of restarting the workers like reset(), the call is sent along with the batch indices dispatched after
+        it, and each worker replays it before loading its next batch, see BaseDataset.__getitems__(). The batches loaded
+        or in flight before the call are skipped. Workers started later copy the dataset of the main process, which has
+        run all calls already, so they do not replay them. Falls back to reset() for datasets without __getitems__, or if the
+        torch DataLoader does not use it (torch<2.0).
+
+        Args:
+            method (str): Name of the dataset method.
+            *args (any): Positional arguments of the method, pickled once when called.
+            **kwargs (any): Keyword arguments of the method.
+        """
+        getattr(self.dataset, method)(*args, **kwargs)
+        if not self.num_workers:
+            return
+        if not (TORCH_2_0 and hasattr(self.dataset, "__getitems__")):
+            self.reset()
+            return
+        self.batch_sampler.updates.append(pickle.dumps((method, args, kwargs)))
+        self.dataset.updates = len(self.batch_sampler.updates)  # ran here, workers started by reset() skip it
+        self.stale = self.batch_sampler.sent - self.received
+
 
 class _RepeatSampler:
     """
@@ -63,16 +101,33 @@ class _RepeatSampler:
 
     Args:
         sampler (Dataset.sampler): The sampler to repeat.
+
+    Attributes:
+        sent (int): Number of batches yielded, i.e. dispatched to the workers.
+        updates (list): Pickled dataset method calls of InfiniteDataLoader.update(), sent along with each batch.
     """
 
     def __init__(self, sampler):
         """Initializes an object that repeats a given sampler indefinitely."""
         self.sampler = sampler
+        self.sent = 0
+        self.updates = []
 
     def __iter__(self):
         """Iterates over the 'sampler' and yields its contents."""
         while True:
-            yield from iter(self.sampler)
+            for batch in iter(self.sampler):
+                self.sent += 1
+                yield _Batch(batch, self.updates) if self.updates else batch
+
+
+class _Batch(list):
+    """Batch of dataset indices with the dataset updates to run before loading them, see InfiniteDataLoader.update()."""
+
+    def __init__(self, indices, updates):
+        """Initializes the batch with its indices and a copy of the list of pickled updates."""
+        super().__init__(indices)
+        self.updates = tuple(updates)
 
 
 def seed_worker(worker_id):  # noqa
@@ -150,7 +205,17 @@ def check_source(source):
     return source, webcam, screenshot, from_img, in_memory, tensor
 
 
-def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
+def load_inference_source(
+    source=None,
+    batch=1,
+    vid_stride=1,
+    buffer=False,
+    prefetch=0,
+    transform=None,
+    wait=0.0,
+    backend="opencv",
+    size=None,
+):
     """
     Loads an inference source for object detection and applies necessary transformations.
 
@@ -159,6 +224,15 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
         batch (int, optional): Batch size for dataloaders. Default is 1.
         vid_stride (int, optional): The frame interval for video sources. Default is 1.
         buffer (bool, optional): Determined whether stream frames will be buffered. Default is False.
+        prefetch (int, optional): Number of image batches read ahead in a thread pool. Default is 0.
+        transform (callable, optional): Transform applied to each image and video frame when reading them, the batches
+            of image and video sources then also contain the transformed images. Default is None.
+        wait (float, optional): Seconds to wait for a frame from every stream before batching only the streams with
+            fresh frames, 0 to wait for all streams. Default is 0.
+        backend (str, optional): Video decoder backend for video and stream sources, 'opencv' or 'pyav'. Default is
+            'opencv'.
+        size (int, optional): Maximum width and height of the video frames decoded by the 'pyav' backend. Default is
+            None, the video resolution.
 
     Returns:
         dataset (Dataset): A dataset object for the specified input source.
@@ -172,13 +246,21 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
     elif in_memory:
         dataset = source
     elif stream:
-        dataset = LoadStreams(source, vid_stride=vid_stride, buffer=buffer)
+        dataset = LoadStreams(source, vid_stride=vid_stride, buffer=buffer, wait=wait, backend=backend, size=size)
     elif screenshot:
         dataset = LoadScreenshots(source)
     elif from_img:
         dataset = LoadPilAndNumpy(source)
     else:
-        dataset = LoadImagesAndVideos(source, batch=batch, vid_stride=vid_stride)
+        dataset = LoadImagesAndVideos(
+            source,
+            batch=batch,
+            vid_stride=vid_stride,
+            prefetch=prefetch,
+            transform=transform,
+            backend=backend,
+            size=size,
+        )
 
     # Attach source types to the dataset
     setattr(dataset, "source_type", source_type)
@@ -1,5 +1,6 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 import contextlib
+import os
 from itertools import repeat
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
@@ -12,18 +13,31 @@ from PIL import Image
 
 from ultralytics.utils import LOCAL_RANK, NUM_THREADS, TQDM, colorstr, is_dir_writeable
 from ultralytics.utils.ops import resample_segments
-from .augment import Compose, Format, Instances, LetterBox, classify_augmentations, classify_transforms, v8_transforms
+from .augment import (
+    BatchAugment,
+    Compose,
+    Format,
+    Instances,
+    LetterBox,
+    classify_augmentations,
+    classify_transforms,
+    v8_transforms,
+)
 from .base import BaseDataset
-from .utils import HELP_URL, LOGGER, get_hash, img2label_paths, verify_image, verify_image_label
+from .utils import HELP_URL, LOGGER, get_fingerprint, get_hash, img2label_paths, verify_image, verify_image_label
 
 # Ultralytics dataset *.cache version, >= 1.0.0 for YOLOv8
-DATASET_CACHE_VERSION = "1.0.3"
+DATASET_CACHE_VERSION = "1.0.4"
 
 
 class YOLODataset(BaseDataset):
     """
     Dataset class for loading object detection and/or segmentation labels in YOLO format.
 
+    Labels are read from YOLO *.txt files by default. Setting 'label_format: kitti' in the dataset YAML reads the KITTI
+    labels written by the Omniverse Replicator KittiWriter (Camera/rgb/*.png with Camera/object_detection/*.txt) directly,
+    mapping the KITTI types to the dataset 'names' case-insensitively, so no intermediate conversion pass is needed.
+
     Args:
         data (dict, optional): A dataset YAML dictionary. Defaults to None.
         task (str): An explicit arg to point current task, Defaults to 'detect'.
@@ -38,66 +52,88 @@ class YOLODataset(BaseDataset):
         self.use_keypoints = task == "pose"
         self.use_obb = task == "obb"
         self.data = data
+        self.label_format = (data or {}).get("label_format", "yolo")
         assert not (self.use_segments and self.use_keypoints), "Can not use both segments and keypoints."
+        assert self.label_format in {"yolo", "kitti"}, f"invalid label_format '{self.label_format}', use yolo or kitti."
+        assert self.label_format == "yolo" or task == "detect", f"label_format={self.label_format} requires task=detect."
         super().__init__(*args, **kwargs)
 
-    def cache_labels(self, path=Path("./labels.cache")):
+    def cache_labels(self, path=Path("./labels.cache"), previous=None):
         """
         Cache dataset labels, check images and read shapes.
 
+        Every image-label pair is stored with a (size, mtime) fingerprint of both files. Given the 'previous' cache of
+        the dataset, only pairs that are new or whose fingerprint changed are verified, the others are merged from it,
+        so appending images to a dataset does not re-verify the existing ones.
+
         Args:
             path (Path): Path where to save the cache file. Default is Path('./labels.cache').
+            previous (dict, optional): An outdated cache of the same dataset to reuse unchanged files from. The label
+                arrays reused from it are copied, as they may be views of the cache file that is rewritten here.
 
         Returns:
             (dict): labels.
         """
-        x = {"labels": []}
+        x = {"labels": [], "files": {}}
         nm, nf, ne, nc, msgs = 0, 0, 0, 0, []  # number missing, found, empty, corrupt, messages
         desc = f"{self.prefix}Scanning {path.parent / path.stem}..."
-        total = len(self.im_files)
         nkpt, ndim = self.data.get("kpt_shape", (0, 0))
         if self.use_keypoints and (nkpt <= 0 or ndim not in (2, 3)):
             raise ValueError(
                 "'kpt_shape' in data.yaml missing or incorrect. Should be a list with [number of "
                 "keypoints, number of dims (2 for x,y or 3 for x,y,visible)], i.e. 'kpt_shape: [17, 3]'"
             )
+        old = (previous or {}).get("files", {})  # im_file: (fingerprint, label, (nm, nf, ne, nc), msg)
+        fingerprints = [get_fingerprint(x) for x in zip(self.im_files, self.label_files)]
+        new = [i for i, (f, fp) in enumerate(zip(self.im_files, fingerprints)) if f not in old or old[f][0] != fp]
+        if old:
+            LOGGER.info(f"{self.prefix}Verifying {len(new)} new or changed of {len(self.im_files)} images...")
         with ThreadPool(NUM_THREADS) as pool:
             results = pool.imap(
                 func=verify_image_label,
                 iterable=zip(
-                    self.im_files,
-                    self.label_files,
+                    [self.im_files[i] for i in new],
+                    [self.label_files[i] for i in new],
                     repeat(self.prefix),
                     repeat(self.use_keypoints),
                     repeat(len(self.data["names"])),
                     repeat(nkpt),
                     repeat(ndim),
+                    repeat(self.kitti_class_map()),
                 ),
             )
-            pbar = TQDM(results, desc=desc, total=total)
-            for im_file, lb, shape, segments, keypoint, nm_f, nf_f, ne_f, nc_f, msg in pbar:
-                nm += nm_f
-                nf += nf_f
-                ne += ne_f
-                nc += nc_f
+            pbar = TQDM(zip(new, results), desc=desc, total=len(new))
+            for i, (im_file, lb, shape, segments, keypoint, nm_f, nf_f, ne_f, nc_f, msg) in pbar:
+                label = None
                 if im_file:
-                    x["labels"].append(
-                        dict(
-                            im_file=im_file,
-                            shape=shape,
-                            cls=lb[:, 0:1],  # n, 1
-                            bboxes=lb[:, 1:],  # n, 4
-                            segments=segments,
-                            keypoints=keypoint,
-                            normalized=True,
-                            bbox_format="xywh",
-                        )
+                    label = dict(
+                        im_file=im_file,
+                        shape=shape,
+                        cls=lb[:, 0:1],  # n, 1
+                        bboxes=lb[:, 1:],  # n, 4
+                        segments=segments,
+                        keypoints=keypoint,
+                        normalized=True,
+                        bbox_format="xywh",
                     )
-                if msg:
-                    msgs.append(msg)
-                pbar.desc = f"{desc} {nf} images, {nm + ne} backgrounds, {nc} corrupt"
+                old[self.im_files[i]] = fingerprints[i], label, (nm_f, nf_f, ne_f, nc_f), msg
+                pbar.desc = f"{desc} {len(new)} new or changed images"
             pbar.close()
 
+        reused = set(self.im_files).difference(self.im_files[i] for i in new)
+        for f in self.im_files:  # merge in dataset order
+            fingerprint, label, (nm_f, nf_f, ne_f, nc_f), msg = old[f]
+            if label and f in reused:  # own the arrays of 'previous', i.e. memory-mapped columns of the old cache
+                label = {k: np.array(v) if isinstance(v, np.ndarray) else v for k, v in label.items()}
+            x["files"][f] = fingerprint, label, (nm_f, nf_f, ne_f, nc_f), msg
+            nm += nm_f
+            nf += nf_f
+            ne += ne_f
+            nc += nc_f
+            if label:
+                x["labels"].append(label)
+            if msg:
+                msgs.append(msg)
         if msgs:
             LOGGER.info("\n".join(msgs))
         if nf == 0:
@@ -108,16 +144,26 @@ class YOLODataset(BaseDataset):
         save_dataset_cache_file(self.prefix, path, x)
         return x
 
+    def kitti_class_map(self):
+        """Returns the lower case KITTI type to class index mapping for 'label_format: kitti', otherwise None."""
+        if self.label_format != "kitti":
+            return None
+        return {str(v).lower(): k for k, v in self.data["names"].items()}
+
     def get_labels(self):
         """Returns dictionary of labels for YOLO training."""
-        self.label_files = img2label_paths(self.im_files)
+        self.label_files = img2label_paths(self.im_files, self.label_format)
         cache_path = Path(self.label_files[0]).parent.with_suffix(".cache")
+        if isinstance(self.img_path, (str, Path)) and Path(self.img_path).parent.suffix == ".npz":
+            cache_path = Path(self.img_path).parent.with_suffix(f".{Path(self.img_path).name}.cache")  # split.train.cache
+        previous = None
         try:
             cache, exists = load_dataset_cache_file(cache_path), True  # attempt to load a *.cache file
             assert cache["version"] == DATASET_CACHE_VERSION  # matches current version
+            previous = cache  # unchanged files of an outdated cache are reused
             assert cache["hash"] == get_hash(self.label_files + self.im_files)  # identical hash
         except (FileNotFoundError, AssertionError, AttributeError):
-            cache, exists = self.cache_labels(cache_path), False  # run cache ops
+            cache, exists = self.cache_labels(cache_path, previous), False  # run cache ops
 
         # Display cache
         nf, nm, ne, nc, n = cache.pop("results")  # found, missing, empty, corrupt, total
@@ -128,7 +174,7 @@ class YOLODataset(BaseDataset):
                 LOGGER.info("\n".join(cache["msgs"]))  # display warnings
 
         # Read cache
-        [cache.pop(k) for k in ("hash", "version", "msgs")]  # remove items
+        [cache.pop(k, None) for k in ("hash", "version", "msgs", "files")]  # remove items
         labels = cache["labels"]
         if not labels:
             LOGGER.warning(f"WARNING ⚠️ No images found in {cache_path}, training may not work correctly. {HELP_URL}")
@@ -154,7 +200,11 @@ class YOLODataset(BaseDataset):
         if self.augment:
             hyp.mosaic = hyp.mosaic if self.augment and not self.rect else 0.0
             hyp.mixup = hyp.mixup if self.augment and not self.rect else 0.0
-            transforms = v8_transforms(self, self.imgsz, hyp)
+            batch = hyp.batch_augment and not (self.rect or self.use_segments or self.use_keypoints or self.use_obb)
+            if hyp.batch_augment and not batch:
+                LOGGER.warning("WARNING ⚠️ 'batch_augment' requires detection without 'rect', augmenting per image")
+            self.batch_augment = BatchAugment(self.imgsz, hyp) if batch else None  # applied by the trainer
+            transforms = v8_transforms(self, self.imgsz, hyp, batch=batch)
         else:
             transforms = Compose([LetterBox(new_shape=(self.imgsz, self.imgsz), scaleup=False)])
         transforms.append(
@@ -343,21 +393,29 @@ class ClassificationDataset(torchvision.datasets.ImageFolder):
 
 
 def load_dataset_cache_file(path):
-    """Load an Ultralytics *.cache dictionary from path."""
+    """Load an Ultralytics *.cache dictionary from path, with the labels of a columnar cache memory-mapped."""
     import gc
 
     gc.disable()  # reduce pickle load time https://github.com/ultralytics/ultralytics/pull/1585
     cache = np.load(str(path), allow_pickle=True).item()  # load dict
     gc.enable()
+    if cache.get("format") == "columnar":
+        cache = columns2labels(cache, np.load(str(columns_path(path)), mmap_mode="r"))
     return cache
 
 
 def save_dataset_cache_file(prefix, path, x):
-    """Save an Ultralytics dataset *.cache dictionary x to path."""
+    """Save an Ultralytics dataset *.cache dictionary x to path, YOLODataset labels without segments as columns."""
     x["version"] = DATASET_CACHE_VERSION  # add cache version
     if is_dir_writeable(path.parent):
         if path.exists():
             path.unlink()  # remove *.cache file if exists
+        if "files" in x and not any(len(lb["segments"]) for lb in x["labels"]):
+            x, columns = labels2columns(x)
+            f = columns_path(path)
+            tmp = f.with_suffix(".tmp.npy")
+            np.save(str(tmp), columns)
+            os.replace(tmp, f)  # new file, memory maps of the old one stay valid
         np.save(str(path), x)  # save cache for next time
         path.with_suffix(".cache.npy").rename(path)  # remove .npy suffix
         LOGGER.info(f"{prefix}New cache created: {path}")
@@ -365,6 +423,85 @@ def save_dataset_cache_file(prefix, path, x):
         LOGGER.warning(f"{prefix}WARNING ⚠️ Cache directory {path.parent} is not writeable, cache not saved.")
 
 
+def columns_path(path):
+    """Returns the path of the label columns stored next to a columnar *.cache file, i.e. labels.cache.lb.npy."""
+    return Path(path).with_name(f"{Path(path).name}.lb.npy")
+
+
+def labels2columns(x):
+    """
+    Convert a YOLODataset cache dictionary to the columnar format.
+
+    The per-image label dictionaries are replaced by per-file arrays, and the labels of all images are concatenated
+    into one (n, 5 + nkpt * 3) float32 array of (cls, x, y, w, h, keypoints) rows with 'offsets' marking the rows of
+    each file. This array is saved uncompressed and memory-mapped on load, so dataloader workers share its pages and
+    loading does not unpickle one object per label.
+
+    Args:
+        x (dict): Cache dictionary with 'labels' and 'files' as written by YOLODataset.cache_labels().
+
+    Returns:
+        (tuple): The columnar cache dictionary and the label array.
+    """
+    files = x["files"]
+    im_files = list(files)
+    nkpt = next((lb["keypoints"].shape[1] for lb in x["labels"] if lb["keypoints"] is not None), None)
+    ncol = 5 + (nkpt or 0) * 3
+    rows, offsets, shapes = [], [0], []
+    for fingerprint, label, counts, msg in files.values():
+        if label:
+            lb = [label["cls"], label["bboxes"]]
+            if nkpt:
+                lb.append(label["keypoints"].reshape(len(label["cls"]), -1))
+            rows.append(np.concatenate(lb, 1))
+            offsets.append(offsets[-1] + len(label["cls"]))
+        else:
+            offsets.append(offsets[-1])
+        shapes.append(label["shape"] if label else (0, 0))
+    meta = {k: v for k, v in x.items() if k not in {"labels", "files"}}
+    meta.update(
+        format="columnar",
+        im_files=np.array(im_files, dtype=str),
+        fingerprints=np.array([v[0] for v in files.values()], dtype=np.int64).reshape(len(files), -1),
+        counts=np.array([v[2] for v in files.values()], dtype=np.uint8).reshape(len(files), 4),
+        file_msgs=np.array([v[3] for v in files.values()], dtype=str),
+        valid=np.array([v[1] is not None for v in files.values()], dtype=bool),
+        shapes=np.array(shapes, dtype=np.int32).reshape(len(files), 2),
+        offsets=np.array(offsets, dtype=np.int64),
+        nkpt=nkpt,
+    )
+    columns = np.concatenate(rows, 0) if rows else np.zeros((0, ncol))
+    return meta, columns.astype(np.float32)
+
+
+def columns2labels(cache, columns):
+    """Convert a columnar cache dictionary back to 'labels' and 'files', label arrays are views into 'columns'."""
+    columns, nkpt, offsets = np.asarray(columns), cache.pop("nkpt"), cache.pop("offsets").tolist()
+    im_files, counts, msgs = (cache.pop(k).tolist() for k in ("im_files", "counts", "file_msgs"))
+    valid, shapes, fingerprints = (cache.pop(k).tolist() for k in ("valid", "shapes", "fingerprints"))
+    labels, files = [], {}
+    for i, f in enumerate(im_files):
+        label = None
+        if valid[i]:
+            lb = columns[offsets[i] : offsets[i + 1]]  # plain ndarray view of the memory map
+            label = dict(
+                im_file=f,
+                shape=tuple(shapes[i]),
+                cls=lb[:, 0:1],  # n, 1
+                bboxes=lb[:, 1:5],  # n, 4
+                segments=[],
+                keypoints=lb[:, 5:].reshape(-1, nkpt, 3) if nkpt else None,
+                normalized=True,
+                bbox_format="xywh",
+            )
+            labels.append(label)
+        fingerprint = tuple(zip(fingerprints[i][::2], fingerprints[i][1::2]))  # ((size, mtime), ...) per file
+        files[f] = fingerprint, label, tuple(counts[i]), msgs[i]
+    cache.pop("format")
+    cache.update(labels=labels, files=files)
+    return cache
+
+
 # TODO: support semantic segmentation
 class SemanticDataset(BaseDataset):
     """
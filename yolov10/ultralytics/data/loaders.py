@@ -4,9 +4,11 @@ import glob
 import math
 import os
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from threading import Thread
+from threading import Condition, Thread
 from urllib.parse import urlparse
 
 import cv2
@@ -16,7 +18,7 @@ import torch
 from PIL import Image
 
 from ultralytics.data.utils import IMG_FORMATS, VID_FORMATS
-from ultralytics.utils import LOGGER, is_colab, is_kaggle, ops
+from ultralytics.utils import LOGGER, NUM_THREADS, is_colab, is_kaggle, ops
 from ultralytics.utils.checks import check_requirements
 
 
@@ -38,6 +40,10 @@ class LoadStreams:
         sources (str): The source input paths or URLs for the video streams.
         vid_stride (int): Video frame-rate stride, defaults to 1.
         buffer (bool): Whether to buffer input streams, defaults to False.
+        wait (float): Seconds to wait for a frame from every stream before batching only the streams with fresh
+            frames, 0 to always wait for all streams. Defaults to 0.
+        backend (str): Video decoder backend, 'opencv' or 'pyav', see video_capture(). Defaults to 'opencv'.
+        size (int, optional): Maximum width and height of the frames decoded by the 'pyav' backend.
         running (bool): Flag to indicate if the streaming thread is running.
         mode (str): Set to 'stream' indicating real-time capture.
         imgs (list): List of image frames for each stream.
@@ -45,7 +51,9 @@ class LoadStreams:
         frames (list): List of total frames for each stream.
         threads (list): List of threads for each stream.
         shape (list): List of shapes for each stream.
-        caps (list): List of cv2.VideoCapture objects for each stream.
+        caps (list): List of video capture objects for each stream.
+        cond (threading.Condition): Condition notified when a frame is read, a frame is taken or a stream ends.
+        streams (list): Stream indices of the images of the last batch, fewer than all streams with 'wait'.
         bs (int): Batch size for processing.
 
     Methods:
@@ -62,11 +70,15 @@ class LoadStreams:
          ```
     """
 
-    def __init__(self, sources="file.streams", vid_stride=1, buffer=False):
+    def __init__(self, sources="file.streams", vid_stride=1, buffer=False, wait=0.0, backend="opencv", size=None):
         """Initialize instance variables and check for consistent input stream shapes."""
         torch.backends.cudnn.benchmark = True  # faster for fixed-size inference
         self.buffer = buffer  # buffer input streams
+        self.wait = wait  # seconds to wait for all streams before batching the streams with fresh frames
+        self.backend = backend  # video decoder
+        self.size = size  # maximum decoded frame size with PyAV
         self.running = True  # running flag for Thread
+        self.cond = Condition()  # frame handoff between reader threads and __next__
         self.mode = "stream"
         self.vid_stride = vid_stride  # video frame-rate stride
 
@@ -80,6 +92,7 @@ class LoadStreams:
         self.imgs = [[] for _ in range(n)]  # images
         self.shape = [[] for _ in range(n)]  # image shapes
         self.sources = [ops.clean_str(x) for x in sources]  # clean source names for later
+        self.streams = list(range(n))  # stream indices of the last batch
         for i, s in enumerate(sources):  # index, source
             # Start thread to read frames from video stream
             st = f"{i + 1}/{n}: {s}... "
@@ -92,7 +105,7 @@ class LoadStreams:
                     "'source=0' webcam not supported in Colab and Kaggle notebooks. "
                     "Try running 'source=0' in a local environment."
                 )
-            self.caps[i] = cv2.VideoCapture(s)  # store video capture object
+            self.caps[i] = video_capture(s, self.backend, self.size, self.vid_stride)  # store video capture object
             if not self.caps[i].isOpened():
                 raise ConnectionError(f"{st}Failed to open {s}")
             w = int(self.caps[i].get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -116,8 +129,10 @@ class LoadStreams:
     def update(self, i, cap, stream):
         """Read stream `i` frames in daemon thread."""
         n, f = 0, self.frames[i]  # frame number, frame array
-        while self.running and cap.isOpened() and n < (f - 1):
-            if len(self.imgs[i]) < 30:  # keep a <=30-image buffer
+        try:
+            while self.running and cap.isOpened() and n < (f - 1):
+                with self.cond:  # wait until the buffer has room, keep a <=30-image buffer
+                    self.cond.wait_for(lambda: len(self.imgs[i]) < 30 or not self.running)
                 n += 1
                 cap.grab()  # .read() = .grab() followed by .retrieve()
                 if n % self.vid_stride == 0:
@@ -126,16 +141,21 @@ class LoadStreams:
                         im = np.zeros(self.shape[i], dtype=np.uint8)
                         LOGGER.warning("WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.")
                         cap.open(stream)  # re-open stream if signal was lost
-                    if self.buffer:
-                        self.imgs[i].append(im)
-                    else:
-                        self.imgs[i] = [im]
-            else:
-                time.sleep(0.01)  # wait until the buffer is empty
+                    with self.cond:
+                        if self.buffer:
+                            self.imgs[i].append(im)
+                        else:
+                            self.imgs[i] = [im]
+                        self.cond.notify_all()
+        finally:
+            with self.cond:
+                self.cond.notify_all()  # stream ended
 
     def close(self):
         """Close stream loader and release resources."""
         self.running = False  # stop flag for Thread
+        with self.cond:
+            self.cond.notify_all()
         for thread in self.threads:
             if thread.is_alive():
                 thread.join(timeout=5)  # Add timeout
@@ -152,30 +172,46 @@ class LoadStreams:
         return self
 
     def __next__(self):
-        """Returns source paths, transformed and original images for processing."""
-        self.count += 1
-
-        images = []
-        for i, x in enumerate(self.imgs):
-            # Wait until a frame is available in each buffer
-            while not x:
-                if not self.threads[i].is_alive() or cv2.waitKey(1) == ord("q"):  # q to quit
-                    self.close()
-                    raise StopIteration
-                time.sleep(1 / min(self.fps))
-                x = self.imgs[i]
-                if not x:
-                    LOGGER.warning(f"WARNING ⚠️ Waiting for stream {i}")
-
-            # Get and remove the first frame from imgs buffer
-            if self.buffer:
-                images.append(x.pop(0))
-
-            # Get the last frame, and clear the rest from the imgs buffer
-            else:
-                images.append(x.pop(-1) if x else np.zeros(self.shape[i], dtype=np.uint8))
-                x.clear()
+        """
+        Returns source paths, transformed and original images for processing.
 
+        Waits for a frame from every stream or, if 'wait' is set, for at most 'wait' seconds and then returns only the
+        streams with fresh frames, so that a slow or stalled stream does not hold back the others.
+        """
+        self.count += 1
+        deadline = time.time() + self.wait
+        while True:
+            with self.cond:
+                ready = [i for i, x in enumerate(self.imgs) if x]
+                waiting = [i for i, x in enumerate(self.imgs) if not x and self.threads[i].is_alive()]
+                if self.wait:  # the streams with fresh frames once all have one or the wait time passed
+                    done = bool(ready) and (not waiting or time.time() >= deadline)
+                    stop = not done and not waiting  # all streams ended
+                else:
+                    done = len(ready) == self.bs
+                    stop = not done and len(ready) + len(waiting) < self.bs  # a stream ended
+                if done:
+                    # Get and remove the first frame from imgs buffer, or get the last frame and clear the rest
+                    images = [self.imgs[i].pop(0) if self.buffer else self.imgs[i].pop(-1) for i in ready]
+                    if not self.buffer:
+                        for i in ready:
+                            self.imgs[i].clear()
+                    self.cond.notify_all()  # room in the buffers
+                    break
+                if stop:
+                    break
+                if not self.cond.wait(max(deadline - time.time(), 0) or 1 / min(self.fps)) and time.time() >= deadline:
+                    LOGGER.warning(f"WARNING ⚠️ Waiting for stream {waiting[0]}")
+            if cv2.waitKey(1) == ord("q"):  # q to quit, handled without holding the condition
+                stop = True
+                break
+
+        if stop:
+            self.close()
+            raise StopIteration
+        self.streams = ready  # a source can be streamed more than once, so its path does not identify the stream
+        if len(ready) < self.bs:
+            return [self.sources[i] for i in ready], images, [""] * len(ready)
         return self.sources, images, [""] * self.bs
 
     def __len__(self):
@@ -262,16 +298,23 @@ class LoadImagesAndVideos:
         mode (str): Current mode, 'image' or 'video'.
         vid_stride (int): Stride for video frame-rate, defaults to 1.
         bs (int): Batch size, set to 1 for this class.
-        cap (cv2.VideoCapture): Video capture object for OpenCV.
+        cap (cv2.VideoCapture | PyAVCapture): Video capture object.
         frame (int): Frame counter for video.
         frames (int): Total number of frames in the video.
         count (int): Counter for iteration, initialized at 0 during `__iter__()`.
+        prefetch (int): Number of image batches read ahead in a thread pool, 0 to read images in `__next__()`.
+        transform (callable, optional): Transform applied to each image, in the thread pool when prefetching. Batches
+            are then (paths, images, info, transformed images).
+        backend (str): Video decoder backend, 'opencv' or 'pyav', see video_capture().
+        size (int, optional): Maximum width and height of the frames decoded by the 'pyav' backend.
 
     Methods:
-        _new_video(path): Create a new cv2.VideoCapture object for a given video path.
+        close(): Cancel the images read ahead and shut down their thread pool.
+        _new_video(path): Create a new video capture object for a given video path.
+        _read_image(path): Read and transform an image.
     """
 
-    def __init__(self, path, batch=1, vid_stride=1):
+    def __init__(self, path, batch=1, vid_stride=1, prefetch=0, transform=None, backend="opencv", size=None):
         """Initialize the Dataloader and raise FileNotFoundError if file not found."""
         parent = None
         if isinstance(path, str) and Path(path).suffix == ".txt":  # *.txt file with img/vid/dir on each line
@@ -302,6 +345,11 @@ class LoadImagesAndVideos:
         self.mode = "image"
         self.vid_stride = vid_stride  # video frame-rate stride
         self.bs = batch
+        self.prefetch = prefetch
+        self.transform = transform
+        self.backend = backend
+        self.size = size
+        self.pool, self.pending = None, deque()  # thread pool and futures of the images read ahead, in order
         if any(videos):
             self._new_video(videos[0])  # new video
         else:
@@ -315,15 +363,22 @@ class LoadImagesAndVideos:
     def __iter__(self):
         """Returns an iterator object for VideoStream or ImageFolder."""
         self.count = 0
+        for f in self.pending:
+            f.cancel()
+        self.pending.clear()
+        if self.prefetch and self.ni and not self.pool:
+            self.pool = ThreadPoolExecutor(min(NUM_THREADS, self.prefetch * self.bs), thread_name_prefix="imread")
         return self
 
     def __next__(self):
         """Returns the next batch of images or video frames along with their paths and metadata."""
-        paths, imgs, info = [], [], []
+        paths, imgs, info, ims = [], [], [], []
+        batch = (paths, imgs, info, ims) if self.transform else (paths, imgs, info)
         while len(imgs) < self.bs:
             if self.count >= self.nf:  # end of file list
+                self.close()
                 if len(imgs) > 0:
-                    return paths, imgs, info  # return last partial batch
+                    return batch  # return last partial batch
                 else:
                     raise StopIteration
 
@@ -344,6 +399,8 @@ class LoadImagesAndVideos:
                         self.frame += 1
                         paths.append(path)
                         imgs.append(im0)
+                        if self.transform:
+                            ims.append(self.transform(im0))
                         info.append(f"video {self.count + 1}/{self.nf} (frame {self.frame}/{self.frames}) {path}: ")
                         if self.frame == self.frames:  # end of video
                             self.count += 1
@@ -357,22 +414,48 @@ class LoadImagesAndVideos:
                         self._new_video(self.files[self.count])
             else:
                 self.mode = "image"
-                im0 = cv2.imread(path)  # BGR
-                if im0 is None:
-                    raise FileNotFoundError(f"Image Not Found {path}")
+                if self.pool:  # read the next images ahead, up to 'prefetch' batches
+                    for i in range(self.count + len(self.pending), min(self.count + self.prefetch * self.bs, self.ni)):
+                        self.pending.append(self.pool.submit(self._read_image, self.files[i]))
+                    im0, im = self.pending.popleft().result()
+                else:
+                    im0, im = self._read_image(path)
                 paths.append(path)
                 imgs.append(im0)
+                if self.transform:
+                    ims.append(im)
                 info.append(f"image {self.count + 1}/{self.nf} {path}: ")
                 self.count += 1  # move to the next file
                 if self.count >= self.ni:  # end of image list
                     break
 
-        return paths, imgs, info
+        return batch
+
+    def close(self):
+        """Cancels the images read ahead and shuts down their thread pool, also when the iteration was abandoned."""
+        for f in self.pending:
+            f.cancel()
+        self.pending.clear()
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def __del__(self):
+        """Shuts down the thread pool of a loader that was not iterated to the end."""
+        if hasattr(self, "pool"):
+            self.close()
+
+    def _read_image(self, path):
+        """Reads an image and returns it with its transformed version, None if there is no transform."""
+        im0 = cv2.imread(path)  # BGR
+        if im0 is None:
+            raise FileNotFoundError(f"Image Not Found {path}")
+        return im0, self.transform(im0) if self.transform else None
 
     def _new_video(self, path):
         """Creates a new video capture object for the given path."""
         self.frame = 0
-        self.cap = cv2.VideoCapture(path)
+        self.cap = video_capture(path, self.backend, self.size, self.vid_stride)
         self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
         if not self.cap.isOpened():
             raise FileNotFoundError(f"Failed to open video {path}")
@@ -502,6 +585,122 @@ class LoadTensor:
         return self.bs
 
 
+class PyAVCapture:
+    """
+    Video capture decoding with PyAV (FFmpeg), with the cv2.VideoCapture methods used by the video and stream loaders.
+
+    FFmpeg decodes with frame and slice threads, and only retrieved frames are converted to BGR, scaled down to 'size'
+    by swscale in the same pass. The loaders grab 'vid_stride' frames per retrieved frame, and the frames grabbed only
+    to be skipped are not decoded at all if no other frame refers to them, i.e. all frames of intra-only codecs like
+    MJPEG and the disposable frames of other codecs.
+
+    Attributes:
+        size (int, optional): Maximum width and height of the retrieved frames, None for the video resolution.
+        vid_stride (int): Number of frames grabbed per retrieved frame.
+        container (av.container.InputContainer): The opened video file or stream, None if it failed to open.
+        stream (av.video.stream.VideoStream): The decoded video stream.
+        frame (av.VideoFrame): The last grabbed frame, None if it was skipped without decoding.
+
+    Example:
+        ```python
+        cap = PyAVCapture("rtsp://example.com/media.mp4", size=1280)
+        success, im = cap.read()
+        ```
+    """
+
+    def __init__(self, source, size=None, vid_stride=1):
+        """Opens a video file or stream, see open()."""
+        check_requirements("av")
+        import av  # noqa
+
+        self.av = av
+        self.size = size
+        self.vid_stride = vid_stride
+        self.container, self.stream, self.frame, self.packets = None, None, None, None
+        self.frames = deque()  # decoded frames not grabbed yet, decoders may return several frames per packet
+        self.grabbed = 0  # number of grab() calls, kept when re-opening so a retrieved grab stays retrieved
+        self.open(source)
+
+    def open(self, source):
+        """Opens a video file or stream URL, releasing the current one, and returns whether it opened."""
+        self.release()
+        try:
+            self.container = self.av.open(str(source))
+            self.stream = self.container.streams.video[0]
+            self.stream.thread_type = "AUTO"  # frame and slice threads
+            self.packets = self.container.demux(self.stream)
+        except (self.av.error.FFmpegError, IndexError) as e:
+            LOGGER.warning(f"WARNING ⚠️ PyAV failed to open {source}: {e}")
+            self.release()
+        return self.isOpened()
+
+    def isOpened(self):
+        """Returns whether a video is open."""
+        return self.container is not None
+
+    def grab(self):
+        """Advances to the next frame, without decoding it if it is skipped for 'vid_stride', and returns success."""
+        self.grabbed += 1
+        return self._next(skip=self.grabbed % self.vid_stride != 0)  # every vid_stride-th grab is retrieved
+
+    def _next(self, skip=False):
+        """Advances to the next frame, decoding it unless 'skip' is set and no other frame refers to it."""
+        if not self.isOpened():
+            return False
+        intra_only = getattr(self.stream.codec_context.codec, "intra_only", False)
+        try:
+            while not self.frames:
+                packet = next(self.packets, None)
+                if packet is None:
+                    self.frame = None
+                    return False
+                if skip and packet.size and (intra_only or getattr(packet, "is_disposable", False)):
+                    self.frame = None  # no other frame refers to it, skip without decoding
+                    return True
+                self.frames.extend(packet.decode())  # an empty packet at the end flushes the decoder
+        except self.av.error.FFmpegError:
+            self.frame = None
+            return False
+        self.frame = self.frames.popleft()
+        return True
+
+    def retrieve(self):
+        """Returns success and the last grabbed frame as a BGR image, scaled to at most 'size'."""
+        if self.frame is None:
+            return False, None
+        w, h = self.shape()
+        return True, self.frame.to_ndarray(format="bgr24", width=w, height=h)
+
+    def read(self):
+        """Grabs and retrieves the next frame, not counted as a grab for 'vid_stride'."""
+        return self.retrieve() if self._next() else (False, None)
+
+    def shape(self):
+        """Returns the width and height of the retrieved frames."""
+        w, h = self.stream.codec_context.width, self.stream.codec_context.height
+        r = min(self.size / max(w, h), 1.0) if self.size else 1.0
+        return round(w * r), round(h * r)
+
+    def get(self, prop):
+        """Returns the cv2.CAP_PROP_* frame width, height, frame count or FPS property, 0 if unknown."""
+        if not self.isOpened():
+            return 0
+        if prop in {cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT}:
+            return self.shape()[prop == cv2.CAP_PROP_FRAME_HEIGHT]
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.stream.frames  # 0 for streams
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.stream.average_rate or self.stream.guessed_rate or 0)
+        return 0
+
+    def release(self):
+        """Closes the video."""
+        if self.container is not None:
+            self.container.close()
+        self.container, self.stream, self.frame, self.packets = None, None, None, None
+        self.frames.clear()
+
+
 def autocast_list(source):
     """Merges a list of source of different types into a list of numpy arrays or PIL images."""
     files = []
@@ -551,5 +750,26 @@ def get_best_youtube_url(url, use_pafy=True):
                 return f.get("url")
 
 
+def video_capture(source, backend="opencv", size=None, vid_stride=1):
+    """
+    Opens a video file, stream or webcam with the given decoder backend.
+
+    Args:
+        source (str | int): Video file path, stream URL or webcam index. Webcams are always opened with OpenCV.
+        backend (str): Decoder backend, 'opencv' for cv2.VideoCapture or 'pyav' for PyAVCapture. Defaults to 'opencv'.
+        size (int, optional): Maximum width and height of the frames decoded by PyAV, None for the video resolution.
+        vid_stride (int): Number of frames grabbed per retrieved frame, PyAV does not decode the skipped frames that
+            no other frame refers to. Defaults to 1.
+
+    Returns:
+        (cv2.VideoCapture | PyAVCapture): The video capture object.
+    """
+    if backend == "opencv" or isinstance(source, int):
+        return cv2.VideoCapture(source)
+    if backend == "pyav":
+        return PyAVCapture(source, size=size, vid_stride=vid_stride)
+    raise ValueError(f"Invalid video backend '{backend}'. Valid backends are 'opencv' and 'pyav'.")
+
+
 # Define constants
 LOADERS = (LoadStreams, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots)
@@ -32,7 +32,7 @@ from ultralytics.utils import (
 )
 from ultralytics.utils.checks import check_file, check_font, is_ascii
 from ultralytics.utils.downloads import download, safe_download, unzip_file
-from ultralytics.utils.ops import segments2boxes
+from ultralytics.utils.ops import segments2boxes, xyxy2xywh
 
 HELP_URL = "See https://docs.ultralytics.com/datasets/detect for dataset formatting guidance."
 IMG_FORMATS = {"bmp", "dng", "jpeg", "jpg", "mpo", "png", "tif", "tiff", "webp", "pfm"}  # image suffixes
@@ -40,9 +40,12 @@ VID_FORMATS = {"asf", "avi", "gif", "m4v", "mkv", "mov", "mp4", "mpeg", "mpg", "
 PIN_MEMORY = str(os.getenv("PIN_MEMORY", True)).lower() == "true"  # global pin_memory for dataloaders
 
 
-def img2label_paths(img_paths):
+def img2label_paths(img_paths, label_format="yolo"):
     """Define label paths as a function of image paths."""
-    sa, sb = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"  # /images/, /labels/ substrings
+    if label_format == "kitti":  # Omniverse Replicator KittiWriter layout, i.e. Camera/rgb/ and Camera/object_detection/
+        sa, sb = f"{os.sep}rgb{os.sep}", f"{os.sep}object_detection{os.sep}"  # /rgb/, /object_detection/ substrings
+    else:
+        sa, sb = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"  # /images/, /labels/ substrings
     return [sb.join(x.rsplit(sa, 1)).rsplit(".", 1)[0] + ".txt" for x in img_paths]
 
 
@@ -54,6 +57,18 @@ def get_hash(paths):
     return h.hexdigest()  # return hash
 
 
+def get_fingerprint(paths):
+    """Returns the (size, mtime) of each path as a tuple, (-1, -1) for missing files, to detect changed files."""
+    fingerprint = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            fingerprint.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            fingerprint.append((-1, -1))
+    return tuple(fingerprint)
+
+
 def exif_size(img: Image.Image):
     """Returns exif-corrected PIL size."""
     s = img.size  # (width, height)
@@ -92,9 +107,32 @@ def verify_image(args):
     return (im_file, cls), nf, nc, msg
 
 
+def kitti2yolo_label(lb_file, shape, class_map):
+    """
+    Read a KITTI label file and convert it to YOLO label rows.
+
+    Args:
+        lb_file (str): Path to the KITTI label file, one 'type truncated occluded alpha x1 y1 x2 y2 ...' row per object.
+        shape (tuple): Image size as (height, width), used to normalize the pixel boxes.
+        class_map (dict): Lower case KITTI type to class index. Rows with other types (i.e. 'DontCare') are skipped.
+
+    Returns:
+        (np.ndarray): Labels of shape (n, 5) as (cls, x, y, w, h) with normalized coordinates.
+    """
+    with open(lb_file) as f:
+        lb = [x.split() for x in f.read().strip().splitlines() if len(x)]
+    lb = [[class_map[x[0].lower()], *x[4:8]] for x in lb if x[0].lower() in class_map]  # cls, x1, y1, x2, y2
+    lb = np.array(lb, dtype=np.float32).reshape(-1, 5)
+    h, w = shape
+    lb[:, [1, 3]] = lb[:, [1, 3]].clip(0, w) / w  # boxes of truncated objects may exceed the image
+    lb[:, [2, 4]] = lb[:, [2, 4]].clip(0, h) / h
+    lb[:, 1:] = xyxy2xywh(lb[:, 1:])
+    return lb
+
+
 def verify_image_label(args):
-    """Verify one image-label pair."""
-    im_file, lb_file, prefix, keypoint, num_cls, nkpt, ndim = args
+    """Verify one image-label pair, KITTI labels are converted with 'kitti_cls' if it is not None."""
+    im_file, lb_file, prefix, keypoint, num_cls, nkpt, ndim, kitti_cls = args
     # Number (missing, found, empty, corrupt), message, segments, keypoints
     nm, nf, ne, nc, msg, segments, keypoints = 0, 0, 0, 0, "", [], None
     try:
@@ -115,13 +153,16 @@ def verify_image_label(args):
         # Verify labels
         if os.path.isfile(lb_file):
             nf = 1  # label found
-            with open(lb_file) as f:
-                lb = [x.split() for x in f.read().strip().splitlines() if len(x)]
-                if any(len(x) > 6 for x in lb) and (not keypoint):  # is segment
-                    classes = np.array([x[0] for x in lb], dtype=np.float32)
-                    segments = [np.array(x[1:], dtype=np.float32).reshape(-1, 2) for x in lb]  # (cls, xy1...)
-                    lb = np.concatenate((classes.reshape(-1, 1), segments2boxes(segments)), 1)  # (cls, xywh)
-                lb = np.array(lb, dtype=np.float32)
+            if kitti_cls is not None:
+                lb = kitti2yolo_label(lb_file, shape, kitti_cls)
+            else:
+                with open(lb_file) as f:
+                    lb = [x.split() for x in f.read().strip().splitlines() if len(x)]
+                    if any(len(x) > 6 for x in lb) and (not keypoint):  # is segment
+                        classes = np.array([x[0] for x in lb], dtype=np.float32)
+                        segments = [np.array(x[1:], dtype=np.float32).reshape(-1, 2) for x in lb]  # (cls, xy1...)
+                        lb = np.concatenate((classes.reshape(-1, 1), segments2boxes(segments)), 1)  # (cls, xywh)
+                    lb = np.array(lb, dtype=np.float32)
             nl = len(lb)
             if nl:
                 if keypoint:
@@ -278,7 +319,7 @@ def check_det_dataset(dataset, autodownload=True):
 
     # Checks
     for k in "train", "val":
-        if k not in data:
+        if k not in data and "manifest" not in data:
             if k != "val" or "validation" not in data:
                 raise SyntaxError(
                     emojis(f"{dataset} '{k}:' key missing ❌.\n'train' and 'val' are required in all data YAMLs.")
@@ -337,6 +378,17 @@ def check_det_dataset(dataset, autodownload=True):
             dt = f"({round(time.time() - t, 1)}s)"
             s = f"success ✅ {dt}, saved to {colorstr('bold', DATASETS_DIR)}" if r in (0, None) else f"failure {dt} ❌"
             LOGGER.info(f"Dataset download {s}\n")
+
+    # Splits of a hashsplit() manifest, i.e. 'manifest: split.npz' sets train to 'split.npz/train'
+    if data.get("manifest"):
+        manifest = (path / data["manifest"]).resolve()
+        if not manifest.is_file():
+            raise FileNotFoundError(f"Dataset '{clean_url(dataset)}' manifest not found ⚠️, missing path '{manifest}'")
+        with np.load(str(manifest)) as x:
+            for k in x.files:
+                if len(x[k]) and not data.get(k):
+                    data[k] = str(manifest / k)
+        data["manifest"] = str(manifest)
     check_font("Arial.ttf" if is_ascii(data["names"]) else "Arial.Unicode.ttf")  # download fonts
 
     return data  # dictionary
@@ -649,3 +701,92 @@ def autosplit(path=DATASETS_DIR / "coco8/images", weights=(0.9, 0.1, 0.0), annot
         if not annotated_only or Path(img2label_paths([str(img)])[0]).exists():  # check label
             with open(path.parent / txt[i], "a") as f:
                 f.write(f"./{img.relative_to(path.parent).as_posix()}" + "\n")  # add image to txt file
+
+
+def hash_fraction(file):
+    """
+    Returns a stable value in [0, 1) for an image from the MD5 hash of its file name without suffix, i.e. its sample id.
+
+    This is the key of hashsplit() and of the KITTI conversion script, so that an image lands in the same split
+    whichever directory it is listed from.
+
+    Args:
+        file (str | Path): Image path or file name.
+
+    Returns:
+        (float): Uniform value in [0, 1), the image is in the first split whose cumulative weight exceeds it.
+    """
+    return int(hashlib.md5(Path(file).stem.encode()).hexdigest()[:8], 16) / 16**8
+
+
+def hashsplit(path=DATASETS_DIR / "coco8/images", weights=(0.9, 0.1, 0.0), manifest=None):
+    """
+    Deterministically split a dataset into train/val/test by a hash of each image name and save a split manifest.
+
+    Every image is assigned by hash_fraction() of its file name, so the assignment does not depend on the order or
+    number of files. Existing manifest entries keep their split and only new images are hashed, which makes appending a
+    generation batch cheap; images no longer on disk are dropped. New images below a 'train', 'val' or 'test' directory
+    of 'path' (an existing images/{train,val,test} layout) keep that split instead of being hashed. The manifest is a
+    single compressed *.npz file holding one array of image paths relative to it per split, and is only rewritten when
+    the splits change. Use it in a dataset YAML with 'manifest: split.npz' in place of 'train'/'val'/'test', or pass
+    'split.npz/train' etc. as an image path directly.
+
+    Args:
+        path (Path, optional): Path to images directory. Defaults to DATASETS_DIR / 'coco8/images'.
+        weights (list | tuple, optional): Train, validation, and test split fractions. Defaults to (0.9, 0.1, 0.0).
+        manifest (Path, optional): Manifest file to update. Defaults to 'split.npz' in the parent of 'path'.
+
+    Returns:
+        (dict): Number of images in each split.
+
+    Example:
+        ```python
+        from ultralytics.data.utils import hashsplit
+
+        hashsplit("path/to/images", weights=(0.8, 0.1, 0.1))
+        ```
+    """
+    path = Path(path)  # images dir
+    manifest = Path(manifest or path.parent / "split.npz")
+    root = str(manifest.parent)
+    splits = {k: [] for k in ("train", "val", "test")}
+    if manifest.exists():
+        splits.update(load_split_manifest(manifest, relative=True))
+
+    # List image files relative to the manifest directory, with the split of an existing images/{split} layout
+    files = {}
+    for dir_path, _, file_names in os.walk(path):
+        rel = os.path.relpath(dir_path, root).replace(os.sep, "/")
+        layout = Path(os.path.relpath(dir_path, path)).parts[:1]
+        layout = layout[0] if layout and layout[0] in splits else None
+        files.update((f"{rel}/{x}", layout) for x in file_names if x.rsplit(".", 1)[-1].lower() in IMG_FORMATS)
+
+    # Keep existing assignments of images still on disk, hash the new ones
+    known, removed = set(), 0
+    for k in splits:
+        known.update(splits[k])
+        kept = [x for x in splits[k] if x in files]
+        removed += len(splits[k]) - len(kept)
+        splits[k] = kept
+    new = sorted(set(files) - known)
+    w = np.cumsum(weights) / sum(weights)
+    for f in new:
+        k = files[f] or ("train", "val", "test")[min(int(np.searchsorted(w, hash_fraction(f), side="right")), 2)]
+        splits[k].append(f)
+
+    n = {k: len(v) for k, v in splits.items()}
+    if new or removed or not manifest.exists():
+        np.savez_compressed(manifest, **{k: np.array(v, dtype=str) for k, v in splits.items()})
+        layout = sum(files[f] is not None for f in new)
+        layout = f" ({layout} kept from their images/{{train,val,test}} directory)" if layout else ""
+        LOGGER.info(f"Hashsplit {len(new)} new images{layout}, {removed} removed from {path}, {n} saved to {manifest}")
+    else:
+        LOGGER.info(f"Hashsplit {manifest} is up to date with {path}, {n}")
+    return n
+
+
+def load_split_manifest(manifest, relative=False):
+    """Load a hashsplit() manifest as a {split: image paths} dictionary, paths are absolute unless 'relative'."""
+    root = "" if relative else str(Path(manifest).resolve().parent) + os.sep
+    with np.load(str(manifest)) as x:
+        return {k: [root + f for f in x[k].tolist()] for k in x.files}
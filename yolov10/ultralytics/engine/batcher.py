@@ -0,0 +1,132 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+Serve many concurrent single-image requests with batched inference.
+
+Usage:
+    from ultralytics import YOLOv10
+    from ultralytics.engine.batcher import MicroBatcher
+
+    with MicroBatcher(YOLOv10("yolov10n.pt"), max_batch=8, max_wait=0.005, imgsz=640) as batcher:
+        result = batcher.predict(image)  # from any thread
+        result = await batcher.predict_async(image)  # from a coroutine
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import cv2
+
+from ultralytics.utils import LOGGER
+
+
+class MicroBatcher:
+    """
+    Collects images from concurrent callers into batches and runs each batch through the model in one forward pass.
+
+    A worker thread waits for the first request, then collects further requests until 'max_batch' images are queued or
+    'max_wait' seconds have passed, predicts them as one batch and hands each caller its own Results. Under many
+    concurrent requests the batch size grows with the load, while a single request waits at most 'max_wait'.
+
+    Attributes:
+        model (Model): The model used for predictions.
+        max_batch (int): Maximum number of images per batch.
+        max_wait (float): Maximum time in seconds to wait for more images after the first one of a batch.
+        kwargs (dict): Prediction arguments, i.e. imgsz or conf, the same for all requests.
+        batches (int): Number of batches run.
+        seen (int): Number of images predicted.
+    """
+
+    def __init__(self, model, max_batch=8, max_wait=0.005, **kwargs):
+        """
+        Initializes the batcher and starts its worker thread.
+
+        Args:
+            model (Model): The model used for predictions, i.e. YOLOv10('yolov10n.pt').
+            max_batch (int): Maximum number of images per batch. Defaults to 8.
+            max_wait (float): Maximum time in seconds to wait for more images for a batch. Defaults to 0.005.
+            **kwargs (any): Prediction arguments, see Model.predict().
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.kwargs = {"verbose": False, **kwargs}
+        self.batches, self.seen = 0, 0
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, im):
+        """
+        Queues an image for prediction.
+
+        Args:
+            im (np.ndarray | PIL.Image | str | Path): BGR image, PIL image or image file path.
+
+        Returns:
+            (concurrent.futures.Future): Future of the image Results.
+        """
+        if not self.thread.is_alive():
+            raise RuntimeError("MicroBatcher is closed")
+        if isinstance(im, (str, Path)):
+            f, im = im, cv2.imread(str(im))  # BGR
+            if im is None:
+                raise FileNotFoundError(f"Image Not Found {f}")
+        future = Future()
+        self.queue.put((im, future))
+        return future
+
+    def predict(self, im, timeout=None):
+        """Predicts an image in the next batch and returns its Results, blocking the calling thread."""
+        return self.submit(im).result(timeout)
+
+    async def predict_async(self, im):
+        """Predicts an image in the next batch and returns its Results, without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(im))
+
+    def _run(self):
+        """Worker loop collecting requests into batches and predicting them until the batcher is closed."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)  # finish this batch, then stop
+                    break
+                batch.append(item)
+
+            ims, futures = zip(*batch)
+            try:
+                results = self.model.predict(list(ims), batch=len(ims), **self.kwargs)
+            except Exception as e:
+                LOGGER.warning(f"WARNING ⚠️ MicroBatcher batch of {len(ims)} images failed: {e}")
+                for f in futures:
+                    f.set_exception(e)
+                continue
+            self.batches += 1
+            self.seen += len(ims)
+            for f, r in zip(futures, results):
+                f.set_result(r)
+
+    def close(self):
+        """Predicts the queued images and stops the worker thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+    def __enter__(self):
+        """Returns the batcher for use as a context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Closes the batcher."""
+        self.close()
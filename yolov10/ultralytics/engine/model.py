@@ -1,10 +1,13 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import inspect
+import queue
 import sys
+import threading
 from pathlib import Path
 from typing import Union
 
+import cv2
 import numpy as np
 import torch
 
@@ -55,6 +58,7 @@ class Model(nn.Module):
         info: Logs or returns information about the model.
         fuse: Fuses Conv2d and BatchNorm2d layers for optimized inference.
         predict: Performs object detection predictions.
+        predict_video: Predicts a video file in batches and writes the annotated video.
         track: Performs object tracking.
         val: Validates the model on a dataset.
         benchmark: Benchmarks the model on various export formats.
@@ -480,6 +484,91 @@ class Model(nn.Module):
         kwargs["mode"] = "track"
         return self.predict(source=source, stream=stream, **kwargs)
 
+    def predict_video(
+        self,
+        source: Union[str, Path],
+        out_path: Union[str, Path] = None,
+        batch: int = 8,
+        **kwargs,
+    ) -> int:
+        """
+        Predicts all frames of a video file in batches and optionally writes the annotated video.
+
+        Frames are decoded and preprocessed in a background thread (the 'pipeline' argument, at least 1) and run
+        through a single predictor session 'batch' frames at a time, while the results are annotated and encoded by
+        another thread. Throughput is then bound by the model instead of decoding, encoding or a predictor setup per frame.
+
+        Args:
+            source (str | Path): Path of the video file.
+            out_path (str | Path, optional): Path of the annotated video to write, with the codec chosen by its suffix
+                (.mp4, .webm or .avi). Defaults to None, no video is written.
+            batch (int): Number of frames per inference batch. Defaults to 8.
+            **kwargs (any): Additional keyword arguments for the predictions, see predict().
+
+        Returns:
+            (int): The number of predicted frames.
+        """
+        kwargs["pipeline"] = max(kwargs.get("pipeline") or 1, 1)
+        results = queue.Queue(maxsize=2 * batch)  # results to annotate and encode
+        stop = threading.Event()  # set when the encoder exits, so that the predictions stop feeding it
+        errors = []  # exception raised by the encoder, re-raised in the calling thread
+        n = 0
+
+        def encode():
+            writer = None
+            try:
+                cap = cv2.VideoCapture(str(source))
+                fps = (cap.get(cv2.CAP_PROP_FPS) or 30) / (kwargs.get("vid_stride") or 1)
+                cap.release()
+                fourcc = {".mp4": "mp4v", ".webm": "vp80"}.get(Path(out_path).suffix.lower(), "MJPG")
+                while True:
+                    r = results.get()
+                    if r is None:  # end of video
+                        break
+                    im = r.plot()
+                    if writer is None:
+                        size = im.shape[1::-1]
+                        writer = cv2.VideoWriter(str(out_path), cv2.VideoWriter_fourcc(*fourcc), fps, size)
+                        if not writer.isOpened():
+                            raise RuntimeError(f"Failed to open video writer for '{out_path}' with codec '{fourcc}'")
+                    writer.write(im)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                stop.set()
+                if writer is not None:
+                    writer.release()
+
+        def put(item):
+            """Puts an item for the encoder, returns False once the encoder has exited."""
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        args = self.predictor.args if self.predictor else None  # restored below, e.g. for pooled models
+        encoder = threading.Thread(target=encode, daemon=True) if out_path else None
+        if encoder:
+            encoder.start()
+        try:
+            for r in self.predict(source=source, stream=True, batch=batch, **kwargs):
+                n += 1
+                if encoder and not put(r):
+                    break
+        finally:
+            if encoder:
+                put(None)
+                encoder.join()
+            if self.predictor:  # 'pipeline' and 'batch' must not persist into later predict() calls
+                defaults = {"pipeline": DEFAULT_CFG_DICT["pipeline"], "batch": 1}
+                self.predictor.args = args or get_cfg(self.predictor.args, defaults)
+        if errors:
+            raise errors[0]
+        return n
+
     def val(
         self,
         validator=None,
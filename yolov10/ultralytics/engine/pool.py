@@ -0,0 +1,130 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+Keep several loaded models in one process, for apps serving more than one checkpoint.
+
+Usage:
+    from ultralytics import YOLOv10
+    from ultralytics.engine.pool import ModelPool
+
+    pool = ModelPool(maxsize=2, model_class=YOLOv10)
+    results = pool.predict("warehouse.pt", source="image.jpg", imgsz=960, conf=0.25)
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+from ultralytics.utils import LOGGER
+
+
+class ModelPool:
+    """
+    A least-recently-used pool of models that are loaded, fused and warmed up once and then reused for predictions.
+
+    Loading a model reads the weights, builds the AutoBackend, fuses the layers and runs a warmup inference, which
+    dominates the latency of a single prediction. Models are kept per weights path, image size, device and half
+    precision, as the predictor of a model is set up for these, and the least recently used model is evicted when
+    more than 'maxsize' are loaded. Models are loaded outside the pool lock, so a slow load only blocks the callers
+    waiting for the same model.
+
+    Attributes:
+        maxsize (int): Maximum number of models kept loaded.
+        model_class (type): Model class used to load the weights, i.e. YOLO or YOLOv10.
+        models (OrderedDict): Loaded models by key, in order of use, least recent first.
+        loading (dict): Futures of the models being loaded by key.
+    """
+
+    def __init__(self, maxsize=4, model_class=None):
+        """
+        Initializes the pool.
+
+        Args:
+            maxsize (int): Maximum number of models kept loaded. Defaults to 4.
+            model_class (type, optional): Model class used to load the weights. Defaults to YOLO.
+        """
+        if model_class is None:
+            from ultralytics import YOLO
+
+            model_class = YOLO
+        self.maxsize = maxsize
+        self.model_class = model_class
+        self.models = OrderedDict()
+        self.loading = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(weights, imgsz=640, device=None, half=False):
+        """Returns the pool key of a model, the resolved weights path, image size, device and half precision."""
+        imgsz = tuple(imgsz) if isinstance(imgsz, (list, tuple)) else imgsz
+        return str(Path(weights).resolve()), imgsz, str(device or ""), bool(half)
+
+    def get(self, weights, imgsz=640, device=None, half=False):
+        """
+        Returns the model for these settings, loading, fusing and warming it up if it is not in the pool yet.
+
+        Args:
+            weights (str | Path): Path to the model weights.
+            imgsz (int | list): Inference image size.
+            device (str, optional): Device to run on, i.e. 'cpu' or '0'. Defaults to the best available device.
+            half (bool): Use FP16 half-precision inference.
+
+        Returns:
+            (Model): The loaded model, with its predictor set up.
+        """
+        k = self.key(weights, imgsz, device, half)
+        with self._lock:
+            if k in self.models:
+                self.models.move_to_end(k)
+                return self.models[k]
+            future = self.loading.get(k)
+            if future is None:  # this caller loads the model, others wait for its future
+                future = self.loading[k] = Future()
+                load = True
+            else:
+                load = False
+        if not load:
+            return future.result()
+
+        try:
+            model = self.model_class(weights)
+            h, w = (imgsz, imgsz) if isinstance(imgsz, int) else imgsz
+            model.predict(np.zeros((h, w, 3), dtype=np.uint8), imgsz=imgsz, device=device, half=half, verbose=False)
+        except BaseException as e:
+            with self._lock:
+                del self.loading[k]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self.loading[k]
+            self.models[k] = model
+            while len(self.models) > self.maxsize:
+                evicted, _ = self.models.popitem(last=False)
+                LOGGER.info(f"ModelPool: evicted {evicted[0]} (imgsz={evicted[1]}, device={evicted[2]})")
+        future.set_result(model)
+        return model
+
+    def predict(self, weights, source=None, imgsz=640, device=None, half=False, **kwargs):
+        """
+        Runs a prediction with the pooled model for these settings, see Model.predict() for the other arguments.
+
+        Returns:
+            (List[ultralytics.engine.results.Results]): The prediction results.
+        """
+        model = self.get(weights, imgsz, device, half)
+        return model.predict(source, imgsz=imgsz, device=device, half=half, **kwargs)
+
+    def clear(self):
+        """Removes all models from the pool."""
+        with self._lock:
+            self.models.clear()
+
+    def __len__(self):
+        """Returns the number of loaded models."""
+        return len(self.models)
+
+    def __contains__(self, key):
+        """Returns whether a model with the key (weights, imgsz, device, half) is loaded."""
+        return self.key(*key) in self.models
@@ -30,8 +30,10 @@ Usage - formats:
 """
 
 import platform
+import queue
 import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
@@ -105,23 +107,30 @@ class BasePredictor:
         self.seen = 0
         self.windows = []
         self.batch = None
+        self.source_state = None  # source mode, frame and fps when the current batch was read
         self.results = None
         self.transforms = None
         self.callbacks = _callbacks or callbacks.get_default_callbacks()
         self.txt_path = None
         self._lock = threading.Lock()  # for automatic thread-safe inference
+        self._buffers = threading.local()  # letterbox buffer of each preprocessing thread
         callbacks.add_integration_callbacks(self)
 
-    def preprocess(self, im):
+    def preprocess(self, im, letterboxed=False):
         """
         Prepares input image before inference.
 
         Args:
             im (torch.Tensor | List(np.ndarray)): BCHW for tensor, [(HWC) x B] for list.
+            letterboxed (bool): Whether the images were already transformed by pre_transform(), e.g. by a prefetching
+                source, so that they are not letterboxed a second time.
         """
         not_tensor = not isinstance(im, torch.Tensor)
+        fast = letterboxed or type(self).pre_transform is BasePredictor.pre_transform
+        if not_tensor and fast and self.same_shape_uint8(im):
+            return self.preprocess_same_shape(im, letterboxed)
         if not_tensor:
-            im = np.stack(self.pre_transform(im))
+            im = np.stack(im if letterboxed else self.pre_transform(im))
             im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW, (n, 3, h, w)
             im = np.ascontiguousarray(im)  # contiguous
             im = torch.from_numpy(im)
@@ -132,6 +141,35 @@ class BasePredictor:
             im /= 255  # 0 - 255 to 0.0 - 1.0
         return im
 
+    @staticmethod
+    def same_shape_uint8(im):
+        """Returns whether a list of images are all uint8 BGR images of one shape, i.e. camera frames or renders."""
+        return im[0].shape[2:] == (3,) and all(x.dtype == np.uint8 and x.shape == im[0].shape for x in im)
+
+    def preprocess_same_shape(self, im, letterboxed=False):
+        """
+        Prepares a batch of same-shape uint8 images before inference.
+
+        The images are letterboxed into one reused NHWC buffer, pinned on CUDA, with the letterbox geometry computed
+        once, and the BGR to RGB flip, BHWC to BCHW permute and normalization run as tensor ops on the device.
+
+        Args:
+            im (List(np.ndarray)): [(HWC) x B] BGR images of one shape.
+            letterboxed (bool): Whether the images are already letterboxed, they are then only copied into the buffer.
+        """
+        key = len(im), im[0].shape, self.imgsz, self.model.pt, letterboxed
+        batch = (lambda x, out=None: np.stack(x, out=out)) if letterboxed else self.letterbox(same_shapes=True).batch
+        if getattr(self._buffers, "key", None) == key:
+            buffer = self._buffers.buffer
+            batch(im, out=buffer.numpy())
+        else:
+            buffer = torch.from_numpy(batch(im))
+            if self.device.type == "cuda":
+                buffer = buffer.pin_memory()
+            self._buffers.key, self._buffers.buffer = key, buffer
+        im = buffer.to(self.device).permute(0, 3, 1, 2)[:, [2, 1, 0]]  # BHWC to BCHW, BGR to RGB, contiguous
+        return (im.half() if self.model.fp16 else im.float()).div_(255)  # uint8 to fp16/32, 0 - 255 to 0.0 - 1.0
+
     def inference(self, im, *args, **kwargs):
         """Runs inference on a given image using the specified model and arguments."""
         visualize = (
@@ -151,14 +189,141 @@ class BasePredictor:
         Returns:
             (list): A list of transformed images.
         """
-        same_shapes = len({x.shape for x in im}) == 1
-        letterbox = LetterBox(self.imgsz, auto=same_shapes and self.model.pt, stride=self.model.stride)
+        letterbox = self.letterbox(same_shapes=len({x.shape for x in im}) == 1)
         return [letterbox(image=x) for x in im]
 
+    def letterbox(self, same_shapes):
+        """Returns the LetterBox of pre_transform() and preprocess_same_shape(), minimum padding only for same shapes."""
+        return LetterBox(self.imgsz, auto=same_shapes and self.model.pt, stride=self.model.stride)
+
     def postprocess(self, preds, img, orig_imgs):
         """Post-processes predictions for an image and returns them."""
         return preds
 
+    def get_source_state(self):
+        """Returns the mode, frame count, fps and stream indices of the batch the source just returned, read with it."""
+        mode = self.dataset.mode
+        fps = self.dataset.fps if mode == "video" else 30
+        streams = getattr(self.dataset, "streams", None)  # stream index of each image, see LoadStreams 'wait'
+        return {"mode": mode, "frame": getattr(self.dataset, "count", None), "fps": fps, "streams": streams}
+
+    def preprocessed_batches(self, profilers):
+        """
+        Yields the batches of the source with their preprocessed images, in source order.
+
+        With 'pipeline' workers the source is read in a background thread and the batches are preprocessed by a pool of
+        threads while the model runs, with at most 2 batches per worker in flight. The preprocess time is then measured
+        in the workers and the time inference waits for the next batch is added to the 'queue' profiler.
+
+        Args:
+            profilers (tuple): The preprocess, inference, postprocess and queue wait profilers.
+
+        Yields:
+            (tuple): The batch (paths, images, strings[, letterboxed images]), the preprocessed image tensor and the
+                source state of the batch, see get_source_state().
+        """
+
+        def preprocess(batch):
+            """Preprocesses the images of a batch, without letterboxing again those the source letterboxed already."""
+            if len(batch) > 3 and len({x.shape for x in batch[1]}) == 1:  # letterboxed to one shape
+                if type(self).preprocess is BasePredictor.preprocess:
+                    return self.preprocess(batch[3], letterboxed=True)
+            return self.preprocess(batch[1])
+
+        if not self.args.pipeline:
+            try:
+                for batch in self.dataset:
+                    with profilers[0]:
+                        im = preprocess(batch)
+                    yield batch, im, self.get_source_state()
+            finally:  # also when the predictions are abandoned, e.g. stop reading images ahead
+                if hasattr(self.dataset, "close"):
+                    self.dataset.close()
+            return
+
+        pending = queue.Queue(maxsize=2 * self.args.pipeline)  # bounded, reading pauses when inference falls behind
+        stop = threading.Event()
+
+        def preprocess_profiled(batch, state):
+            with ops.Profile(device=self.device) as dt:
+                im = preprocess(batch)
+            return batch, im, state, dt.dt
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    return pending.put(item, timeout=0.1)
+                except queue.Full:
+                    pass
+
+        def read():
+            with ThreadPoolExecutor(self.args.pipeline, thread_name_prefix="preprocess") as pool:
+                try:
+                    for batch in self.dataset:
+                        if stop.is_set():
+                            break
+                        put(pool.submit(preprocess_profiled, batch, self.get_source_state()))  # state read with batch
+                except Exception as e:
+                    put(e)
+                finally:
+                    if hasattr(self.dataset, "close"):  # also when the predictions were abandoned
+                        self.dataset.close()
+                    put(None)  # end of source
+
+        threading.Thread(target=read, daemon=True).start()
+        try:
+            while True:
+                with profilers[3]:
+                    item = pending.get()
+                    if isinstance(item, Exception):
+                        raise item
+                    if item is None:
+                        return
+                    batch, im, state, profilers[0].dt = item.result()
+                profilers[0].t += profilers[0].dt
+                yield batch, im, state
+        finally:
+            stop.set()
+
+    def predicted_batches(self, profilers, *args, **kwargs):
+        """
+        Yields the batches of the source with their preprocessed images and predictions, in source order.
+
+        With 'pipeline' workers, ONNX Runtime and OpenVINO models start inference on the next batch before the
+        predictions of a batch are yielded, so the model keeps running while the batch is postprocessed and its results
+        saved. The inference profiler then measures the time spent waiting for the predictions.
+
+        Args:
+            profilers (tuple): The preprocess, inference, postprocess and queue wait profilers.
+
+        Yields:
+            (tuple): The batch, the preprocessed image tensor, the predictions and the source state of the batch.
+        """
+        batches = self.preprocessed_batches(profilers)
+        if not self.args.pipeline or not (self.model.xml or self.model.onnx and not self.model.dnn):
+            for self.batch, im, self.source_state in batches:
+                self.run_callbacks("on_predict_batch_start")
+                with profilers[1]:
+                    preds = self.inference(im, *args, **kwargs)
+                yield self.batch, im, preds, self.source_state
+            return
+
+        def result(batch, im, state, future):
+            with profilers[1]:
+                return batch, im, future.result(), state
+
+        submitted = None
+        for batch, im, state in batches:
+            # the caller sets self.batch and self.source_state to the yielded batch while this generator is suspended
+            self.batch, self.source_state = batch, state
+            self.run_callbacks("on_predict_batch_start")
+            future = self.model.submit(im)
+            if submitted:
+                yield result(*submitted)
+            submitted = batch, im, state, future
+        if submitted:
+            yield result(*submitted)
+
     def __call__(self, source=None, model=None, stream=False, *args, **kwargs):
         """Performs inference on an image or stream."""
         self.stream = stream
@@ -194,6 +359,11 @@ class BasePredictor:
             batch=self.args.batch,
             vid_stride=self.args.vid_stride,
             buffer=self.args.stream_buffer,
+            wait=self.args.stream_wait,
+            backend=self.args.vid_backend,
+            size=max(self.imgsz),  # decode PyAV video frames at most at the inference size
+            prefetch=self.args.prefetch,
+            transform=(lambda x: self.pre_transform([x])[0]) if self.args.prefetch and not self.transforms else None,
         )
         self.source_type = self.dataset.source_type
         if not getattr(self, "stream", True) and (
@@ -233,22 +403,14 @@ class BasePredictor:
                 ops.Profile(device=self.device),
                 ops.Profile(device=self.device),
                 ops.Profile(device=self.device),
+                ops.Profile(),
             )
             self.run_callbacks("on_predict_start")
-            for self.batch in self.dataset:
-                self.run_callbacks("on_predict_batch_start")
-                paths, im0s, s = self.batch
-
-                # Preprocess
-                with profilers[0]:
-                    im = self.preprocess(im0s)
-
-                # Inference
-                with profilers[1]:
-                    preds = self.inference(im, *args, **kwargs)
-                    if self.args.embed:
-                        yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
-                        continue
+            for self.batch, im, preds, self.source_state in self.predicted_batches(profilers, *args, **kwargs):
+                paths, im0s, s = self.batch[:3]
+                if self.args.embed:
+                    yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
+                    continue
 
                 # Postprocess
                 with profilers[2]:
@@ -264,6 +426,8 @@ class BasePredictor:
                         "inference": profilers[1].dt * 1e3 / n,
                         "postprocess": profilers[2].dt * 1e3 / n,
                     }
+                    if self.args.pipeline:
+                        self.results[i].speed["queue"] = profilers[3].dt * 1e3 / n
                     if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
                         s[i] += self.write_results(i, Path(paths[i]), im, s)
 
@@ -284,8 +448,10 @@ class BasePredictor:
             t = tuple(x.t / self.seen * 1e3 for x in profilers)  # speeds per image
             LOGGER.info(
                 f"Speed: %.1fms preprocess, %.1fms inference, %.1fms postprocess per image at shape "
-                f"{(min(self.args.batch, self.seen), 3, *im.shape[2:])}" % t
+                f"{(min(self.args.batch, self.seen), 3, *im.shape[2:])}" % t[:3]
             )
+            if self.args.pipeline:
+                LOGGER.info(f"Pipeline: %.1fms waiting for preprocessing per image, {self.args.pipeline} workers" % t[3])
         if self.args.save or self.args.save_txt or self.args.save_crop:
             nl = len(list(self.save_dir.glob("labels/*.txt")))  # number of labels
             s = f"\n{nl} label{'s' * (nl > 1)} saved to {self.save_dir / 'labels'}" if self.args.save_txt else ""
@@ -315,13 +481,14 @@ class BasePredictor:
         if len(im.shape) == 3:
             im = im[None]  # expand for batch dim
         if self.source_type.stream or self.source_type.from_img or self.source_type.tensor:  # batch_size >= 1
-            string += f"{i}: "
-            frame = self.dataset.count
+            streams = self.source_state["streams"]
+            string += f"{streams[i] if streams else i}: "
+            frame = self.source_state["frame"]
         else:
             match = re.search(r"frame (\d+)/", s[i])
             frame = int(match.group(1)) if match else None  # 0 if frame undetermined
 
-        self.txt_path = self.save_dir / "labels" / (p.stem + ("" if self.dataset.mode == "image" else f"_{frame}"))
+        self.txt_path = self.save_dir / "labels" / (p.stem + ("" if self.source_state["mode"] == "image" else f"_{frame}"))
         string += "%gx%g " % im.shape[2:]
         result = self.results[i]
         result.save_dir = self.save_dir.__str__()  # used in other locations
@@ -354,8 +521,8 @@ class BasePredictor:
         im = self.plotted_img
 
         # Save videos and streams
-        if self.dataset.mode in {"stream", "video"}:
-            fps = self.dataset.fps if self.dataset.mode == "video" else 30
+        if self.source_state["mode"] in {"stream", "video"}:
+            fps = self.source_state["fps"]
             frames_path = f'{save_path.split(".", 1)[0]}_frames/'
             if save_path not in self.vid_writer:  # new video
                 if self.args.save_frames:
@@ -385,7 +552,7 @@ class BasePredictor:
             cv2.namedWindow(p, cv2.WINDOW_NORMAL | cv2.WINDOW_KEEPRATIO)  # allow window resize (Linux)
             cv2.resizeWindow(p, im.shape[1], im.shape[0])  # (width, height)
         cv2.imshow(p, im)
-        cv2.waitKey(300 if self.dataset.mode == "image" else 1)  # 1 millisecond
+        cv2.waitKey(300 if self.source_state["mode"] == "image" else 1)  # 1 millisecond
 
     def run_callbacks(self, event: str):
         """Runs all registered callbacks for a specific event."""
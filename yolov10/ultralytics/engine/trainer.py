@@ -40,9 +40,11 @@ from ultralytics.utils.checks import check_amp, check_file, check_imgsz, check_m
 from ultralytics.utils.dist import ddp_cleanup, generate_ddp_command
 from ultralytics.utils.files import get_latest_run
 from ultralytics.utils.torch_utils import (
+    CheckpointWriter,
     EarlyStopping,
     ModelEMA,
     de_parallel,
+    half_copy,
     init_seeds,
     one_cycle,
     select_device,
@@ -155,6 +157,8 @@ class BaseTrainer:
         self.tloss = None
         self.loss_names = ["Loss"]
         self.csv = self.save_dir / "results.csv"
+        self.results = None  # results of all epochs, read from an existing results.csv by the first save_metrics()
+        self.ckpt_writer = CheckpointWriter()
         self.plot_idx = [0, 1, 2]
 
         # Callbacks
@@ -353,7 +357,6 @@ class BaseTrainer:
             # Update dataloader attributes (optional)
             if epoch == (self.epochs - self.args.close_mosaic):
                 self._close_dataloader_mosaic()
-                self.train_loader.reset()
 
             if RANK in (-1, 0):
                 LOGGER.info(self.progress_string())
@@ -436,6 +439,9 @@ class BaseTrainer:
                 # Save model
                 if self.args.save or final_epoch:
                     self.save_model()
+                    callbacks = self.callbacks["on_model_save"]
+                    if any(not str(getattr(cb, "__module__", "")).startswith("ultralytics.") for cb in callbacks):
+                        self.ckpt_writer.wait()  # user callbacks may read the checkpoints, integrations wait themselves
                     self.run_callbacks("on_model_save")
 
             # Scheduler
@@ -469,6 +475,7 @@ class BaseTrainer:
                 f"\n{epoch - self.start_epoch + 1} epochs completed in "
                 f"{(time.time() - self.train_time_start) / 3600:.3f} hours."
             )
+            self.ckpt_writer.close()
             self.final_eval()
             if self.args.plots:
                 self.plot_metrics()
@@ -477,19 +484,17 @@ class BaseTrainer:
         self.run_callbacks("teardown")
 
     def save_model(self):
-        """Save model training checkpoints with additional metadata."""
-        import pandas as pd  # scope for faster startup
-
+        """Save model training checkpoints with additional metadata, written in the background by self.ckpt_writer."""
         metrics = {**self.metrics, **{"fitness": self.fitness}}
-        results = {k.strip(): v for k, v in pd.read_csv(self.csv).to_dict(orient="list").items()}
+        results = {k: list(v) for k, v in self.results.items()}
         ckpt = {
             "epoch": self.epoch,
             "best_fitness": self.best_fitness,
-            "model": deepcopy(de_parallel(self.model)).half(),
-            "ema": deepcopy(self.ema.ema).half(),
+            "model": half_copy(de_parallel(self.model)),
+            "ema": half_copy(self.ema.ema),
             "updates": self.ema.updates,
-            "optimizer": self.optimizer.state_dict(),
-            "train_args": vars(self.args),  # save as dict
+            "optimizer": deepcopy(self.optimizer.state_dict()),  # copy the state, training continues during the write
+            "train_args": dict(vars(self.args)),  # save as dict
             "train_metrics": metrics,
             "train_results": results,
             "date": datetime.now().isoformat(),
@@ -498,12 +503,13 @@ class BaseTrainer:
             "docs": "https://docs.ultralytics.com",
         }
 
-        # Save last and best
-        torch.save(ckpt, self.last)
+        # Save last, best and periodic checkpoints
+        files = [self.last]
         if self.best_fitness == self.fitness:
-            torch.save(ckpt, self.best)
+            files.append(self.best)
         if (self.save_period > 0) and (self.epoch > 0) and (self.epoch % self.save_period == 0):
-            torch.save(ckpt, self.wdir / f"epoch{self.epoch}.pt")
+            files.append(self.wdir / f"epoch{self.epoch}.pt")
+        self.ckpt_writer.save(ckpt, *files)
 
     @staticmethod
     def get_dataset(data):
@@ -602,13 +608,25 @@ class BaseTrainer:
         pass
 
     def save_metrics(self, metrics):
-        """Saves training metrics to a CSV file."""
+        """Saves training metrics to a CSV file and adds them to the results kept for the checkpoints."""
+        if self.results is None:
+            self.results = self.read_results()
         keys, vals = list(metrics.keys()), list(metrics.values())
+        for k, v in zip(["epoch"] + keys, [self.epoch + 1] + [float(x) for x in vals]):
+            self.results.setdefault(k, []).append(v)
         n = len(metrics) + 1  # number of cols
         s = "" if self.csv.exists() else (("%23s," * n % tuple(["epoch"] + keys)).rstrip(",") + "\n")  # header
         with open(self.csv, "a") as f:
             f.write(s + ("%23.5g," * n % tuple([self.epoch + 1] + vals)).rstrip(",") + "\n")
 
+    def read_results(self):
+        """Returns the results of a CSV file written by earlier epochs, i.e. when resuming, as a dict of columns."""
+        if not self.csv.exists():
+            return {}
+        import pandas as pd  # scope for faster startup
+
+        return {k.strip(): v for k, v in pd.read_csv(self.csv).to_dict(orient="list").items()}
+
     def plot_metrics(self):
         """Plot and display metrics visually."""
         pass
@@ -685,12 +703,15 @@ class BaseTrainer:
             self._close_dataloader_mosaic()
 
     def _close_dataloader_mosaic(self):
-        """Update dataloaders to stop using mosaic augmentation."""
+        """Update dataloaders to stop using mosaic augmentation, also in the running dataloader workers."""
         if hasattr(self.train_loader.dataset, "mosaic"):
             self.train_loader.dataset.mosaic = False
         if hasattr(self.train_loader.dataset, "close_mosaic"):
             LOGGER.info("Closing dataloader mosaic")
-            self.train_loader.dataset.close_mosaic(hyp=self.args)
+            if hasattr(self.train_loader, "update"):  # InfiniteDataLoader
+                self.train_loader.update("close_mosaic", hyp=self.args)
+            else:
+                self.train_loader.dataset.close_mosaic(hyp=self.args)
 
     def build_optimizer(self, model, name="auto", lr=0.001, momentum=0.9, decay=1e-5, iterations=1e5):
         """
@@ -57,6 +57,9 @@ class DetectionTrainer(BaseTrainer):
     def preprocess_batch(self, batch):
         """Preprocesses a batch of images by scaling and converting to float."""
         batch["img"] = batch["img"].to(self.device, non_blocking=True).float() / 255
+        batch_augment = getattr(self.train_loader.dataset, "batch_augment", None)
+        if batch_augment:  # perspective, HSV and flip augmentations of the batch, see 'batch_augment'
+            batch = batch_augment(batch)
         if self.args.multi_scale:
             imgs = batch["img"]
             sz = (
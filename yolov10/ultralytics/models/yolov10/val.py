@@ -1,12 +1,18 @@
 from ultralytics.models.yolo.detect import DetectionValidator
+from ultralytics.nn.modules import v10Detect
 from ultralytics.utils import ops
-import torch
 
 class YOLOv10DetectionValidator(DetectionValidator):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.args.save_json |= self.is_coco
 
+    def init_metrics(self, model):
+        super().init_metrics(model)
+        for m in model.modules():
+            if isinstance(m, v10Detect):
+                m.one2one_only = not self.training  # the one2many predictions are only needed for the training loss
+
     def postprocess(self, preds):
         if isinstance(preds, dict):
             preds = preds["one2one"]
@@ -18,7 +24,4 @@ class YOLOv10DetectionValidator(DetectionValidator):
         if preds.shape[-1] == 6:
             return preds
         else:
-            preds = preds.transpose(-1, -2)
-            boxes, scores, labels = ops.v10postprocess(preds, self.args.max_det, self.nc)
-            bboxes = ops.xywh2xyxy(boxes)
-            return torch.cat([bboxes, scores.unsqueeze(-1), labels.unsqueeze(-1)], dim=-1)
\ No newline at end of file
+            return ops.v10postprocess_batch(preds.transpose(-1, -2), self.args.max_det, self.nc)[0]
\ No newline at end of file
@@ -4,8 +4,10 @@ import ast
 import contextlib
 import json
 import platform
+import threading
 import zipfile
 from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
@@ -186,7 +188,13 @@ class AutoBackend(nn.Module):
 
             providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if cuda else ["CPUExecutionProvider"]
             session = onnxruntime.InferenceSession(w, providers=providers)
+            input_name = session.get_inputs()[0].name
             output_names = [x.name for x in session.get_outputs()]
+            io_binding = session.io_binding()
+            io_device = "cuda" if session.get_providers()[0] == "CUDAExecutionProvider" else "cpu"
+            io_buffers, io_key = {}, None  # reused output arrays by input shape and dtype, bound input shape and dtype
+            io_lock = threading.Lock()  # the binding and output arrays are shared by concurrent forward() calls
+            executor = ThreadPoolExecutor(1, thread_name_prefix="onnxruntime")  # for submit()
             metadata = session.get_modelmeta().custom_metadata_map
 
         # OpenVINO
@@ -212,6 +220,10 @@ class AutoBackend(nn.Module):
                 config={"PERFORMANCE_HINT": inference_mode},
             )
             input_name = ov_compiled_model.input().get_any_name()
+            ov_request = ov_compiled_model.create_infer_request()  # reused for LATENCY mode inference
+            io_lock = threading.Lock()  # the reused request and its outputs are shared by concurrent forward() calls
+            ov_queue = None  # persistent AsyncInferQueue for THROUGHPUT mode and submit(), created on first use
+            ov_lock = threading.Lock()
             metadata = w.parent / "metadata.yaml"
 
         # TensorRT
@@ -433,32 +445,40 @@ class AutoBackend(nn.Module):
 
         # ONNX Runtime
         elif self.onnx:
-            im = im.cpu().numpy()  # torch to numpy
-            y = self.session.run(self.output_names, {self.session.get_inputs()[0].name: im})
+            im = (im if self.io_device == "cuda" else im.cpu()).contiguous()  # bound in place, no numpy copy
+            dtype = np.float16 if im.dtype == torch.float16 else np.float32
+            device_id = im.device.index or 0
+            key = tuple(im.shape), dtype
+            with self.io_lock:  # e.g. models of a ModelPool or MicroBatcher called from several threads
+                self.io_binding.bind_input(self.input_name, im.device.type, device_id, dtype, im.shape, im.data_ptr())
+                if key in self.io_buffers:  # run into the output arrays kept for this shape
+                    y = self.io_buffers[key]
+                    if key != self.io_key:
+                        self.io_binding.clear_binding_outputs()
+                        for name, x in zip(self.output_names, y):
+                            self.io_binding.bind_output(name, "cpu", 0, x.dtype, x.shape, x.ctypes.data)
+                        self.io_key = key
+                    self.session.run_with_iobinding(self.io_binding)
+                else:  # first run for this shape, keep the outputs ONNX Runtime allocates for reuse
+                    self.io_binding.clear_binding_outputs()
+                    for name in self.output_names:
+                        self.io_binding.bind_output(name, "cpu")
+                    self.session.run_with_iobinding(self.io_binding)
+                    y = self.io_buffers[key] = self.io_binding.copy_outputs_to_cpu()
+                    self.io_key = None
+                y = [self.from_numpy(x) for x in y]  # copied before the next call overwrites the arrays
 
         # OpenVINO
         elif self.xml:
             im = im.cpu().numpy()  # FP32
 
             if self.inference_mode in {"THROUGHPUT", "CUMULATIVE_THROUGHPUT"}:  # optimized for larger batch-sizes
-                n = im.shape[0]  # number of images in batch
-                results = [None] * n  # preallocate list with None to match the number of images
-
-                def callback(request, userdata):
-                    """Places result in preallocated list using userdata index."""
-                    results[userdata] = request.results
-
-                # Create AsyncInferQueue, set the callback and start asynchronous inference for each input image
-                async_queue = self.ov.runtime.AsyncInferQueue(self.ov_compiled_model)
-                async_queue.set_callback(callback)
-                for i in range(n):
-                    # Start async inference with userdata=i to specify the position in results list
-                    async_queue.start_async(inputs={self.input_name: im[i : i + 1]}, userdata=i)  # keep image as BCHW
-                async_queue.wait_all()  # wait for all inference requests to complete
-                y = np.concatenate([list(r.values())[0] for r in results])
+                y = self.ov_submit(im).result()  # images of the batch run in parallel on the AsyncInferQueue
 
             else:  # inference_mode = "LATENCY", optimized for fastest first result at batch-size 1
-                y = list(self.ov_compiled_model(im).values())
+                with self.io_lock:  # reused request, reading the input and returning the outputs in place
+                    y = self.ov_request.infer({self.input_name: im}, share_inputs=True, share_outputs=True)
+                    y = [self.from_numpy(x) for x in y.values()]  # copied before the next call overwrites them
 
         # TensorRT
         elif self.engine:
@@ -562,6 +582,91 @@ class AutoBackend(nn.Module):
         else:
             return self.from_numpy(y)
 
+    def submit(self, im):
+        """
+        Starts inference on an image tensor and returns without waiting for the outputs.
+
+        OpenVINO models run the images on a persistent AsyncInferQueue and ONNX Runtime models run in a background
+        thread, so that the next batch can be submitted while the outputs of the previous one are processed. Other
+        backends run the inference before returning.
+
+        Args:
+            im (torch.Tensor): The image tensor to perform inference on.
+
+        Returns:
+            (concurrent.futures.Future): Future of the forward() outputs.
+        """
+        if self.xml:
+            return self.ov_submit((im.half() if self.fp16 else im).cpu().numpy())
+        if self.onnx and not self.dnn:
+            return self.executor.submit(self.forward, im)
+        future = Future()
+        future.set_result(self.forward(im))
+        return future
+
+    def ov_submit(self, im):
+        """
+        Starts OpenVINO inference of each image of a batch on the persistent AsyncInferQueue.
+
+        The queue is created on the first call. A failed request never reaches the queue callback, so the queue is
+        also waited on in a background thread which completes the future with the error instead.
+
+        Args:
+            im (np.ndarray): The BCHW image batch.
+
+        Returns:
+            (concurrent.futures.Future): Future of the concatenated output tensor of the batch.
+        """
+        with self.ov_lock:
+            if self.ov_queue is None:
+                import openvino as ov
+
+                self.ov_queue = ov.runtime.AsyncInferQueue(self.ov_compiled_model)
+                self.ov_queue.set_callback(self._ov_callback)
+                self.executor = ThreadPoolExecutor(1, thread_name_prefix="openvino")  # waits for failed requests
+        future, n = Future(), im.shape[0]
+        state = {"future": future, "results": [None] * n, "pending": n}
+        try:
+            for i in range(n):
+                # Start async inference with userdata to place the result in the batch, keep image as BCHW
+                self.ov_queue.start_async(inputs={self.input_name: im[i : i + 1]}, userdata=(state, i))
+        except Exception as e:
+            self._ov_done(state, error=e)
+            return future
+        self.executor.submit(self._ov_wait, state)
+        return future
+
+    def _ov_wait(self, state):
+        """Waits for the requests of the AsyncInferQueue and fails the batch of 'state' if one of them failed."""
+        try:
+            self.ov_queue.wait_all()
+        except Exception as e:
+            self._ov_done(state, error=e)
+
+    def _ov_callback(self, request, userdata):
+        """Keeps the output of a finished OpenVINO request and completes its batch future after the last one."""
+        state, i = userdata
+        try:
+            state["results"][i] = request.get_output_tensor(0).data.copy()  # request buffers are reused by the queue
+            with self.ov_lock:
+                state["pending"] -= 1
+                done = state["pending"] == 0
+            if done:
+                self._ov_done(state, result=self.from_numpy(np.concatenate(state["results"])))
+        except Exception as e:
+            self._ov_done(state, error=e)
+
+    def _ov_done(self, state, result=None, error=None):
+        """Completes the future of a batch once, with its result or the first error of its requests."""
+        with self.ov_lock:
+            if state.get("done"):
+                return
+            state["done"] = True
+        if error is None:
+            state["future"].set_result(result)
+        else:
+            state["future"].set_exception(error)
+
     def from_numpy(self, x):
         """
         Convert a numpy array to a tensor.
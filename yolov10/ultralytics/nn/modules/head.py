@@ -497,6 +497,7 @@ class RTDETRDecoder(nn.Module):
 class v10Detect(Detect):
 
     max_det = 300
+    one2one_only = False  # skip the one2many branch at inference, set by predict and val
 
     def __init__(self, nc=80, ch=()):
         super().__init__(nc, ch)
@@ -510,19 +511,17 @@ class v10Detect(Detect):
     
     def forward(self, x):
         one2one = self.forward_feat([xi.detach() for xi in x], self.one2one_cv2, self.one2one_cv3)
-        if not self.export:
-            one2many = super().forward(x)
-
         if not self.training:
             one2one = self.inference(one2one)
-            if not self.export:
-                return {"one2many": one2many, "one2one": one2one}
-            else:
+            if self.export:
                 assert(self.max_det != -1)
                 boxes, scores, labels = ops.v10postprocess(one2one.permute(0, 2, 1), self.max_det, self.nc)
                 return torch.cat([boxes, scores.unsqueeze(-1), labels.unsqueeze(-1).to(boxes.dtype)], dim=-1)
-        else:
-            return {"one2many": one2many, "one2one": one2one}
+            if self.one2one_only:
+                return {"one2one": one2one}
+
+        one2many = super().forward(x)
+        return {"one2many": one2many, "one2one": one2one}
 
     def bias_init(self):
         super().bias_init()
@@ -55,13 +55,14 @@ def on_predict_postprocess_end(predictor: object, persist: bool = False) -> None
     path, im0s = predictor.batch[:2]
 
     is_obb = predictor.args.task == "obb"
-    is_stream = predictor.dataset.mode == "stream"
+    streams = predictor.source_state["streams"]  # stream of each image, fewer than all streams with 'stream_wait'
     for i in range(len(im0s)):
-        tracker = predictor.trackers[i if is_stream else 0]
+        j = streams[i] if streams else 0  # tracker index
+        tracker = predictor.trackers[j]
         vid_path = predictor.save_dir / Path(path[i]).name
-        if not persist and predictor.vid_path[i if is_stream else 0] != vid_path:
+        if not persist and predictor.vid_path[j] != vid_path:
             tracker.reset()
-            predictor.vid_path[i if is_stream else 0] = vid_path
+            predictor.vid_path[j] = vid_path
 
         det = (predictor.results[i].obb if is_obb else predictor.results[i].boxes).cpu().numpy()
         if len(det) == 0:
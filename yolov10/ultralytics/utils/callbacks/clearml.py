@@ -136,6 +136,7 @@ def on_train_end(trainer):
         for k, v in trainer.validator.metrics.results_dict.items():
             task.get_logger().report_single_value(k, v)
         # Log the final model
+        trainer.ckpt_writer.wait()  # best.pt is written in the background
         task.update_output_model(model_path=str(trainer.best), model_name=trainer.args.name, auto_delete_file=False)
 
 
@@ -285,6 +285,7 @@ def _log_plots(experiment, trainer):
 def _log_model(experiment, trainer):
     """Log the best-trained model to Comet.ml."""
     model_name = _get_comet_model_name()
+    trainer.ckpt_writer.wait()  # best.pt is written in the background
     experiment.log_model(model_name, file_or_folder=str(trainer.best), file_name="best.pt", overwrite=True)
 
 
@@ -125,6 +125,7 @@ def on_train_end(trainer):
         _log_plots(trainer.validator.plots, "val")
         _log_confusion_matrix(trainer.validator)
 
+        trainer.ckpt_writer.wait()  # best.pt is written in the background
         if trainer.best.exists():
             live.log_artifact(trainer.best, copy=True, type="model")
 
@@ -52,6 +52,7 @@ def on_model_save(trainer):
         is_best = trainer.best_fitness == trainer.fitness
         if time() - session.timers["ckpt"] > session.rate_limits["ckpt"]:
             LOGGER.info(f"{PREFIX}Uploading checkpoint {HUB_WEB_ROOT}/models/{session.model.id}")
+            trainer.ckpt_writer.wait()  # last.pt is written in the background
             session.upload_model(trainer.epoch, trainer.last, is_best)
             session.timers["ckpt"] = time()  # reset timer
 
@@ -62,6 +63,7 @@ def on_train_end(trainer):
     if session:
         # Upload final model and metrics with exponential standoff
         LOGGER.info(f"{PREFIX}Syncing final model...")
+        trainer.ckpt_writer.wait()  # best.pt is written in the background
         session.upload_model(
             trainer.epoch,
             trainer.best,
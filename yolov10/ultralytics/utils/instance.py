@@ -100,10 +100,7 @@ class Bboxes:
             scale = to_4tuple(scale)
         assert isinstance(scale, (tuple, list))
         assert len(scale) == 4
-        self.bboxes[:, 0] *= scale[0]
-        self.bboxes[:, 1] *= scale[1]
-        self.bboxes[:, 2] *= scale[2]
-        self.bboxes[:, 3] *= scale[3]
+        self.bboxes *= scale
 
     def add(self, offset):
         """
@@ -114,10 +111,7 @@ class Bboxes:
             offset = to_4tuple(offset)
         assert isinstance(offset, (tuple, list))
         assert len(offset) == 4
-        self.bboxes[:, 0] += offset[0]
-        self.bboxes[:, 1] += offset[1]
-        self.bboxes[:, 2] += offset[2]
-        self.bboxes[:, 3] += offset[3]
+        self.bboxes += offset
 
     def __len__(self):
         """Return the number of boxes."""
@@ -177,8 +171,13 @@ class Instances:
     """
     Container for bounding boxes, segments, and keypoints of detected objects in an image.
 
+    Scaling, padding, (de)normalizing and flipping are applied to the boxes right away, but only recorded for the
+    segments and keypoints, as one composed scale and offset per axis that is applied in a single pass when they are
+    accessed. RandomPerspective folds it into its own matrix instead, see deferred().
+
     Attributes:
         _bboxes (Bboxes): Internal object for handling bounding box operations.
+        _affine (tuple | None): Pending (scale x, scale y, offset x, offset y) of the segments and keypoints.
         keypoints (ndarray): keypoints(x, y, visible) with shape [N, 17, 3]. Default is None.
         normalized (bool): Flag indicating whether the bounding box coordinates are normalized.
         segments (ndarray): Segments array with shape [N, 1000, 2] after resampling.
@@ -213,9 +212,71 @@ class Instances:
             keypoints (ndarray): keypoints(x, y, visible) with shape [N, 17, 3].
         """
         self._bboxes = Bboxes(bboxes=bboxes, format=bbox_format)
-        self.keypoints = keypoints
+        self._affine = None
+        self._keypoints = keypoints
+        self._segments = segments
         self.normalized = normalized
-        self.segments = segments
+
+    @property
+    def segments(self):
+        """Return segments, with the pending scale and offset applied."""
+        self._apply_affine()
+        return self._segments
+
+    @segments.setter
+    def segments(self, segments):
+        """Set segments, applying the pending scale and offset to the keypoints first."""
+        self._apply_affine()
+        self._segments = segments
+
+    @property
+    def keypoints(self):
+        """Return keypoints, with the pending scale and offset applied."""
+        self._apply_affine()
+        return self._keypoints
+
+    @keypoints.setter
+    def keypoints(self, keypoints):
+        """Set keypoints, applying the pending scale and offset to the segments first."""
+        self._apply_affine()
+        self._keypoints = keypoints
+
+    def _affine_points(self, sx, sy, tx, ty):
+        """Composes the scale (sx, sy) followed by the offset (tx, ty) into the pending transform of the points."""
+        if self._affine is not None:
+            sx0, sy0, tx0, ty0 = self._affine
+            sx, sy, tx, ty = sx0 * sx, sy0 * sy, tx0 * sx + tx, ty0 * sy + ty
+        self._affine = sx, sy, tx, ty
+
+    def _apply_affine(self):
+        """Applies the pending scale and offset to the segments and keypoints in place."""
+        if self._affine is None:
+            return
+        sx, sy, tx, ty = self._affine
+        self._affine = None
+        for xy in (self._segments, self._keypoints):
+            if xy is not None and len(xy):
+                for i, (scale, offset) in enumerate(((sx, tx), (sy, ty))):
+                    if scale != 1:
+                        xy[..., i] *= scale
+                    if offset:
+                        xy[..., i] += offset
+
+    def deferred(self):
+        """
+        Returns the segments and keypoints without the pending scale and offset, and the 3x3 matrix of it.
+
+        A transform that maps the points with a matrix anyway can compose this matrix into its own and so touch every
+        point once. The points of this instance are not valid afterwards, the transform should return a new Instances.
+
+        Returns:
+            segments (ndarray): Segments before the pending transform.
+            keypoints (ndarray | None): Keypoints before the pending transform.
+            M (ndarray): The 3x3 float32 matrix of the pending transform.
+        """
+        sx, sy, tx, ty = self._affine or (1, 1, 0, 0)
+        M = np.array([[sx, 0, tx], [0, sy, ty], [0, 0, 1]], dtype=np.float32)
+        return self._segments, self._keypoints, M
 
     def convert_bbox(self, format):
         """Convert bounding box format."""
@@ -231,22 +292,14 @@ class Instances:
         self._bboxes.mul(scale=(scale_w, scale_h, scale_w, scale_h))
         if bbox_only:
             return
-        self.segments[..., 0] *= scale_w
-        self.segments[..., 1] *= scale_h
-        if self.keypoints is not None:
-            self.keypoints[..., 0] *= scale_w
-            self.keypoints[..., 1] *= scale_h
+        self._affine_points(scale_w, scale_h, 0, 0)
 
     def denormalize(self, w, h):
         """Denormalizes boxes, segments, and keypoints from normalized coordinates."""
         if not self.normalized:
             return
         self._bboxes.mul(scale=(w, h, w, h))
-        self.segments[..., 0] *= w
-        self.segments[..., 1] *= h
-        if self.keypoints is not None:
-            self.keypoints[..., 0] *= w
-            self.keypoints[..., 1] *= h
+        self._affine_points(w, h, 0, 0)
         self.normalized = False
 
     def normalize(self, w, h):
@@ -254,22 +307,14 @@ class Instances:
         if self.normalized:
             return
         self._bboxes.mul(scale=(1 / w, 1 / h, 1 / w, 1 / h))
-        self.segments[..., 0] /= w
-        self.segments[..., 1] /= h
-        if self.keypoints is not None:
-            self.keypoints[..., 0] /= w
-            self.keypoints[..., 1] /= h
+        self._affine_points(1 / w, 1 / h, 0, 0)
         self.normalized = True
 
     def add_padding(self, padw, padh):
         """Handle rect and mosaic situation."""
         assert not self.normalized, "you should add padding with absolute coordinates."
         self._bboxes.add(offset=(padw, padh, padw, padh))
-        self.segments[..., 0] += padw
-        self.segments[..., 1] += padh
-        if self.keypoints is not None:
-            self.keypoints[..., 0] += padw
-            self.keypoints[..., 1] += padh
+        self._affine_points(1, 1, padw, padh)
 
     def __getitem__(self, index) -> "Instances":
         """
@@ -308,9 +353,7 @@ class Instances:
             self.bboxes[:, 3] = h - y1
         else:
             self.bboxes[:, 1] = h - self.bboxes[:, 1]
-        self.segments[..., 1] = h - self.segments[..., 1]
-        if self.keypoints is not None:
-            self.keypoints[..., 1] = h - self.keypoints[..., 1]
+        self._affine_points(1, -1, 0, h)
 
     def fliplr(self, w):
         """Reverses the order of the bounding boxes and segments horizontally."""
@@ -321,23 +364,19 @@ class Instances:
             self.bboxes[:, 2] = w - x1
         else:
             self.bboxes[:, 0] = w - self.bboxes[:, 0]
-        self.segments[..., 0] = w - self.segments[..., 0]
-        if self.keypoints is not None:
-            self.keypoints[..., 0] = w - self.keypoints[..., 0]
+        self._affine_points(-1, 1, w, 0)
 
     def clip(self, w, h):
         """Clips bounding boxes, segments, and keypoints values to stay within image boundaries."""
         ori_format = self._bboxes.format
         self.convert_bbox(format="xyxy")
-        self.bboxes[:, [0, 2]] = self.bboxes[:, [0, 2]].clip(0, w)
-        self.bboxes[:, [1, 3]] = self.bboxes[:, [1, 3]].clip(0, h)
+        np.clip(self.bboxes, 0, (w, h, w, h), out=self.bboxes)
         if ori_format != "xyxy":
             self.convert_bbox(format=ori_format)
-        self.segments[..., 0] = self.segments[..., 0].clip(0, w)
-        self.segments[..., 1] = self.segments[..., 1].clip(0, h)
-        if self.keypoints is not None:
-            self.keypoints[..., 0] = self.keypoints[..., 0].clip(0, w)
-            self.keypoints[..., 1] = self.keypoints[..., 1].clip(0, h)
+        for xy in (self.segments, self.keypoints):
+            if xy is not None and len(xy):
+                np.clip(xy[..., 0], 0, w, out=xy[..., 0])
+                np.clip(xy[..., 1], 0, h, out=xy[..., 1])
 
     def remove_zero_area_boxes(self):
         """
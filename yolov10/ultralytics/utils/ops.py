@@ -861,4 +861,46 @@ def v10postprocess(preds, max_det, nc=80):
     labels = index % nc
     index = index // nc
     boxes = boxes.gather(dim=1, index=index.unsqueeze(-1).repeat(1, 1, boxes.shape[-1]))
-    return boxes, scores, labels
\ No newline at end of file
+    return boxes, scores, labels
+
+def v10postprocess_batch(preds, max_det, nc=80, conf=None, classes=None, img1_shape=None, img0_shapes=None):
+    """
+    Batched YOLOv10 postprocess that selects, filters and rescales the detections of all images in one pass on the
+    device, without per-image Python loops.
+
+    Args:
+        preds (torch.Tensor): Predictions of shape (batch, anchors, 4 + nc), xywh boxes followed by class scores.
+        max_det (int): Maximum number of detections per image.
+        nc (int): Number of classes.
+        conf (float, optional): Keep only detections with a score above this threshold.
+        classes (List[int], optional): Keep only detections of these classes.
+        img1_shape (tuple, optional): Letterboxed (height, width) of the input images the boxes are in.
+        img0_shapes (List[tuple], optional): Original (height, width) of each image to rescale the boxes to.
+
+    Returns:
+        (torch.Tensor): Detections of shape (batch, max_det, 6) as (x1, y1, x2, y2, score, class) sorted by score,
+            zero padded after the valid detections of each image.
+        (torch.Tensor): Number of valid detections of each image, shape (batch,).
+    """
+    assert 4 + nc == preds.shape[-1]
+    boxes, scores = preds.split([4, nc], dim=-1)
+    if classes is not None:  # zero the scores of other classes, filtered by the conf threshold below
+        scores = scores * torch.isin(torch.arange(nc, device=preds.device), torch.tensor(classes, device=preds.device))
+    max_det = min(max_det, scores.shape[1])
+    index = scores.amax(dim=-1).topk(max_det, dim=-1)[1]  # top anchors
+    scores, index2 = scores.gather(1, index.unsqueeze(-1).expand(-1, -1, nc)).flatten(1).topk(max_det, dim=-1)
+    labels = index2 % nc
+    index = index.gather(1, index2 // nc)  # anchor of each (anchor, class) pair
+    boxes = xywh2xyxy(boxes.gather(1, index.unsqueeze(-1).expand(-1, -1, 4)))
+
+    if img0_shapes is not None:  # letterbox un-scaling, see scale_boxes()
+        hw = torch.tensor(img0_shapes, device=preds.device, dtype=boxes.dtype)[:, None]  # (batch, 1, 2)
+        gain = torch.minimum(img1_shape[0] / hw[..., 0], img1_shape[1] / hw[..., 1])  # (batch, 1)
+        pad = ((torch.tensor(img1_shape[::-1], device=preds.device) - hw.flip(-1) * gain[..., None]) / 2 - 0.1).round()
+        boxes = (boxes - pad.repeat(1, 1, 2)) / gain[..., None]
+        boxes = torch.minimum(boxes.clamp_(min=0), hw.flip(-1).repeat(1, 1, 2))  # clip
+    dets = torch.cat([boxes, scores.unsqueeze(-1), labels.unsqueeze(-1).to(boxes.dtype)], dim=-1)
+    if conf is None:
+        return dets, torch.full(dets.shape[:1], max_det, device=dets.device)
+    valid = scores > conf  # scores are sorted, so valid detections come first
+    return dets * valid.unsqueeze(-1), valid.sum(1)
@@ -1,9 +1,11 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
+import io
 import math
 import os
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from copy import deepcopy
 from pathlib import Path
@@ -463,6 +465,19 @@ class ModelEMA:
             copy_attr(self.ema, model, include, exclude)
 
 
+def half_copy(model):
+    """
+    Returns an FP16 copy of a model, casting its floating point parameters and buffers while copying them.
+
+    Equivalent to deepcopy(model).half(), without allocating an FP32 copy of all weights first.
+    """
+    memo = {}
+    for t in (*model.parameters(), *model.buffers()):
+        x = t.detach().half() if t.is_floating_point() else t.detach().clone()
+        memo[id(t)] = nn.Parameter(x, requires_grad=t.requires_grad) if isinstance(t, nn.Parameter) else x
+    return deepcopy(model, memo).half()
+
+
 def strip_optimizer(f: Union[str, Path] = "best.pt", s: str = "") -> None:
     """
     Strip optimizer from 'f' to finalize training, optionally save as 's'.
@@ -608,3 +623,60 @@ class EarlyStopping:
                 f"i.e. `patience=300` or use `patience=0` to disable EarlyStopping."
             )
         return stop
+
+
+class CheckpointWriter:
+    """
+    Writes training checkpoints in a background thread, so that serializing and saving them does not block training.
+
+    A checkpoint is serialized once and the same bytes are written to all its files, each through a temporary file
+    that replaces the previous one, so an interrupted write never leaves a truncated checkpoint behind. At most one
+    checkpoint is pending, a new one waits for the previous write to finish.
+
+    Attributes:
+        executor (ThreadPoolExecutor): The writer thread, started with the first checkpoint.
+        future (concurrent.futures.Future): The pending write, if any.
+    """
+
+    def __init__(self):
+        """Initializes the writer without starting its thread."""
+        self.executor = None
+        self.future = None
+
+    def save(self, ckpt, *files):
+        """
+        Queues a checkpoint to be written to one or more files.
+
+        Args:
+            ckpt (dict): The checkpoint, its tensors must not be modified until it is written.
+            *files (str | Path): The files to write the checkpoint to, i.e. 'last.pt' and 'best.pt'.
+        """
+        self.wait()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="CheckpointWriter")
+        self.future = self.executor.submit(self._write, ckpt, files)
+
+    @staticmethod
+    def _write(ckpt, files):
+        """Serializes the checkpoint once and writes it to each file."""
+        buffer = io.BytesIO()
+        torch.save(ckpt, buffer)
+        for f in files:
+            tmp = Path(f).with_suffix(".tmp")
+            tmp.write_bytes(buffer.getbuffer())
+            os.replace(tmp, f)
+
+    def wait(self):
+        """Waits for the pending checkpoint to be written, raising any error of the write."""
+        if self.future is not None:
+            future, self.future = self.future, None
+            future.result()
+
+    def close(self):
+        """Waits for the pending checkpoint and stops the writer thread."""
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
@@ -1,20 +1,11 @@
-import os
+from ultralytics.data.utils import hashsplit
 
-for i in ["train", "val", "test"]:
-    # Specify the directory you want to scan
-    target_directory = f'yolov10/datasets/images/{i}'
+# Specify the directory you want to scan, new images are appended to an existing manifest and keep their split
+target_directory = 'yolov10/datasets/images'
 
-    # Specify the output text file
-    output_file = f'yolov10/datasets/{i}.txt'
+# Assign every image to train/val/test by a hash of its name and write the yolov10/datasets/split.npz manifest,
+# which is loaded with 'manifest: split.npz' in data.yaml. Images already sorted into images/{train,val,test} keep
+# that split, and the manifest is left untouched when no image was added or removed.
+splits = hashsplit(target_directory, weights=(0.8, 0.1, 0.1))
 
-    # Open the output file in write mode
-    with open(output_file, 'w') as f:
-        # Traverse the directory and its subdirectories
-        for root, dirs, files in os.walk(target_directory):
-            for file in files:
-                # Get the relative path of the file
-                relative_path = os.path.relpath(os.path.join(root, file), target_directory)
-                # Write the relative path to the text file
-                f.write(f'./images/{i}/' + relative_path + '\n')
-
-    print(f'All file paths have been written to {output_file}')
+print(f'Split {splits} images in yolov10/datasets/split.npz')